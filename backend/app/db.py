@@ -43,6 +43,11 @@ def init_db() -> None:
         )
         """
     )
+    # Columns added after the initial schema
+    cur.execute("PRAGMA table_info(papers)")
+    columns = {r["name"] for r in cur.fetchall()}
+    if "explanations" not in columns:
+        cur.execute("ALTER TABLE papers ADD COLUMN explanations TEXT")
     conn.commit()
     conn.close()
 
@@ -59,6 +64,27 @@ def create_user(user_id: str, name: str, avatar_url: Optional[str] = None) -> Di
     return {"id": user_id, "name": name, "avatar_url": avatar_url}
 
 
+def get_user(user_id: str) -> Optional[Dict[str, Any]]:
+    conn = get_conn()
+    cur = conn.cursor()
+    cur.execute("SELECT id, name, avatar_url, created_at FROM users WHERE id = ?", (user_id,))
+    row = cur.fetchone()
+    conn.close()
+    return dict(row) if row else None
+
+
+def import_user(user: Dict[str, Any]) -> None:
+    """Insert a user row exactly as read from another replica (see storage.publish_user)"""
+    conn = get_conn()
+    cur = conn.cursor()
+    cur.execute(
+        "INSERT OR REPLACE INTO users (id, name, avatar_url, created_at) VALUES (?, ?, ?, ?)",
+        (user["id"], user["name"], user.get("avatar_url"), user["created_at"]),
+    )
+    conn.commit()
+    conn.close()
+
+
 def list_users() -> List[Dict[str, Any]]:
     conn = get_conn()
     cur = conn.cursor()
@@ -68,6 +94,50 @@ def list_users() -> List[Dict[str, Any]]:
     return [dict(r) for r in rows]
 
 
+_PAPER_COLUMNS = (
+    "paper_id", "user_id", "title", "domain_tags", "glossary", "text",
+    "file_path", "pages", "file_size", "created_at", "explanations",
+)
+
+_UPSERT_PAPER_SQL = """
+    INSERT INTO papers (paper_id, user_id, title, domain_tags, glossary, text, file_path, pages, file_size, created_at)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT(paper_id) DO UPDATE SET
+        title=excluded.title,
+        domain_tags=excluded.domain_tags,
+        glossary=excluded.glossary,
+        text=excluded.text,
+        file_path=excluded.file_path,
+        pages=excluded.pages,
+        file_size=excluded.file_size
+"""
+
+
+def _paper_row(
+    paper_id: str,
+    user_id: str,
+    title: str,
+    domain_tags: Optional[List[str]],
+    glossary: Optional[Dict[str, str]],
+    text: str,
+    file_path: Optional[str],
+    pages: Optional[int],
+    file_size: Optional[int],
+) -> Tuple[Any, ...]:
+    return (
+        paper_id,
+        user_id,
+        title,
+        json.dumps(domain_tags or []),
+        json.dumps(glossary or {}),
+        text,
+        file_path,
+        pages,
+        file_size,
+        datetime.utcnow().isoformat(),
+    )
+
+
 def upsert_paper(
     paper_id: str,
     user_id: str,
@@ -82,30 +152,52 @@ def upsert_paper(
     conn = get_conn()
     cur = conn.cursor()
     cur.execute(
-        """
-        INSERT INTO papers (paper_id, user_id, title, domain_tags, glossary, text, file_path, pages, file_size, created_at)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ON CONFLICT(paper_id) DO UPDATE SET
-            title=excluded.title,
-            domain_tags=excluded.domain_tags,
-            glossary=excluded.glossary,
-            text=excluded.text,
-            file_path=excluded.file_path,
-            pages=excluded.pages,
-            file_size=excluded.file_size
-        """,
-        (
-            paper_id,
-            user_id,
-            title,
-            json.dumps(domain_tags or []),
-            json.dumps(glossary or {}),
-            text,
-            file_path,
-            pages,
-            file_size,
-            datetime.utcnow().isoformat(),
-        ),
+        _UPSERT_PAPER_SQL,
+        _paper_row(paper_id, user_id, title, domain_tags, glossary, text, file_path, pages, file_size),
+    )
+    conn.commit()
+    conn.close()
+
+
+def upsert_papers(papers: List[Dict[str, Any]]) -> None:
+    """Upsert many papers in a single transaction; each dict takes upsert_paper's arguments"""
+    if not papers:
+        return
+    conn = get_conn()
+    try:
+        with conn:
+            conn.executemany(_UPSERT_PAPER_SQL, [_paper_row(**p) for p in papers])
+    finally:
+        conn.close()
+
+
+def import_paper(meta: Dict[str, Any]) -> None:
+    """Insert a paper row exactly as read from another replica (see storage.publish_paper_meta)"""
+    columns = [c for c in _PAPER_COLUMNS if c in meta]
+    conn = get_conn()
+    cur = conn.cursor()
+    cur.execute(
+        f"INSERT OR REPLACE INTO papers ({', '.join(columns)}) VALUES ({', '.join('?' for _ in columns)})",
+        tuple(meta[c] for c in columns),
+    )
+    conn.commit()
+    conn.close()
+
+
+def update_paper_explanations(paper_id: str, explanations: Dict[str, str]) -> None:
+    """Merge precomputed explanations into the stored ones for a paper"""
+    conn = get_conn()
+    cur = conn.cursor()
+    cur.execute("SELECT explanations FROM papers WHERE paper_id = ?", (paper_id,))
+    row = cur.fetchone()
+    if row is None:
+        conn.close()
+        return
+    merged = json.loads(row["explanations"] or "{}")
+    merged.update(explanations)
+    cur.execute(
+        "UPDATE papers SET explanations = ? WHERE paper_id = ?",
+        (json.dumps(merged), paper_id),
     )
     conn.commit()
     conn.close()
@@ -0,0 +1,79 @@
+import gzip
+import hashlib
+import json
+import os
+from typing import Any
+
+from flask import Response, request
+
+try:
+    import orjson
+except ImportError:  # fall back to the stdlib encoder
+    orjson = None
+
+try:
+    import brotli
+except ImportError:  # gzip only
+    brotli = None
+
+# Responses smaller than this are not worth compressing
+COMPRESS_MIN_BYTES = int(os.environ.get('GLOSSIFY_COMPRESS_MIN_BYTES', '1024'))
+GZIP_LEVEL = int(os.environ.get('GLOSSIFY_GZIP_LEVEL', '6'))
+BROTLI_QUALITY = int(os.environ.get('GLOSSIFY_BROTLI_QUALITY', '5'))
+
+
+def dumps(payload: Any) -> bytes:
+    """Serialize to compact JSON bytes (sorted keys, matching jsonify's ordering)"""
+    if orjson is not None:
+        return orjson.dumps(payload, option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(payload, sort_keys=True, separators=(',', ':'), default=str).encode('utf-8')
+
+
+def json_response(payload: Any, status: int = 200, etag: bool = False) -> Response:
+    """
+    Build a JSON response with the fast serializer.
+    With etag=True a content-hash ETag is attached, and on GET/HEAD a matching
+    If-None-Match returns an empty 304 (RFC 9110 only allows 304 for those methods).
+    """
+    body = dumps(payload)
+    response = Response(body, status=status, mimetype='application/json')
+    if etag and status == 200:
+        # Weak, because the same payload may be sent gzip- or brotli-encoded
+        tag = hashlib.sha256(body).hexdigest()[:32]
+        response.set_etag(tag, weak=True)
+        if request.method in ('GET', 'HEAD') and request.if_none_match.contains_weak(tag):
+            not_modified = Response(status=304)
+            not_modified.set_etag(tag, weak=True)
+            return not_modified
+    return response
+
+
+def compress_response(response: Response) -> Response:
+    """after_request hook: brotli/gzip-encode JSON bodies above COMPRESS_MIN_BYTES"""
+    if (
+        response.status_code < 200
+        or response.status_code >= 300
+        or response.direct_passthrough
+        or 'Content-Encoding' in response.headers
+        or response.mimetype != 'application/json'
+    ):
+        return response
+
+    body = response.get_data()
+    if len(body) < COMPRESS_MIN_BYTES:
+        return response
+
+    accept = request.accept_encodings
+    if brotli is not None and accept['br']:
+        encoded = brotli.compress(body, quality=BROTLI_QUALITY)
+        encoding = 'br'
+    elif accept['gzip']:
+        encoded = gzip.compress(body, compresslevel=GZIP_LEVEL)
+        encoding = 'gzip'
+    else:
+        return response
+
+    response.set_data(encoded)
+    response.headers['Content-Encoding'] = encoding
+    response.vary.add('Accept-Encoding')
+    return response
@@ -0,0 +1,316 @@
+"""
+Bulk ingest of existing PDFs into Glossify.
+
+Walks a directory (or reads a .zip archive), extracts text in a process pool,
+runs DocumentAnalyzer with bounded LLM concurrency and writes papers to the DB
+in batched transactions. PDFs are copied into storage only when their batch is
+committed, and progress is checkpointed after every committed batch, so re-running
+the same command resumes where an interrupted run stopped.
+
+Usage (from backend/app):
+    python ingest.py ~/papers --user-id <profile id>
+    python ingest.py papers.zip --workers 8 --llm-concurrency 4 --batch-size 50
+    python ingest.py ~/papers --precompute
+"""
+import argparse
+import json
+import os
+import sys
+import time
+import uuid
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from db import get_paper_meta, init_db, upsert_papers
+from llm import DocumentAnalyzer
+from pdf_io import PdfPageStream
+from precompute import precompute_explanations
+from storage import get_storage, pdf_key, publish_paper_meta
+
+# ("file", path, None) or ("zip", archive path, member name)
+Source = Tuple[str, str, Optional[str]]
+
+
+def iter_sources(path: str) -> Iterator[Source]:
+    """Yield every PDF under a directory or inside a zip archive, in a stable order"""
+    if zipfile.is_zipfile(path):
+        with zipfile.ZipFile(path) as zf:
+            for name in sorted(zf.namelist()):
+                if name.lower().endswith('.pdf') and not name.endswith('/'):
+                    yield ("zip", path, name)
+        return
+    if os.path.isfile(path):
+        yield ("file", path, None)
+        return
+    for root, dirs, files in os.walk(path):
+        dirs.sort()
+        for name in sorted(files):
+            if name.lower().endswith('.pdf'):
+                yield ("file", os.path.join(root, name), None)
+
+
+def source_key(source: Source) -> str:
+    kind, location, member = source
+    if kind == "zip":
+        return f"{os.path.abspath(location)}::{member}"
+    return os.path.abspath(location)
+
+
+def read_source(source: Source) -> bytes:
+    kind, location, member = source
+    if kind == "zip":
+        with zipfile.ZipFile(location) as zf:
+            return zf.read(member)
+    with open(location, 'rb') as f:
+        return f.read()
+
+
+def parse_source(source: Source) -> Dict[str, Any]:
+    """Extract text from one PDF (runs in a worker process)"""
+    try:
+        file_content = read_source(source)
+        stream = PdfPageStream(file_content)
+        text = "".join(stream)
+        if not text:
+            return {"source": source, "error": "Could not extract text from PDF"}
+        return {
+            "source": source,
+            "text": text,
+            "title": stream.title_guess(text) or "Untitled Document",
+            "pages": stream.page_count,
+            "file_size": len(file_content),
+        }
+    except Exception as e:
+        return {"source": source, "error": repr(e)}
+
+
+def analyze_parsed(parsed: Dict[str, Any]) -> Dict[str, Any]:
+    """Run document analysis for a parsed PDF (runs in the LLM thread pool)"""
+    document_analyzer = DocumentAnalyzer()
+    domain_tags, glossary = document_analyzer.analyze_document(parsed["title"], parsed["text"])
+    return {**parsed, "domain_tags": domain_tags, "glossary": glossary}
+
+
+class Checkpoint:
+    """Maps source keys to paper IDs (or errors) for already-processed PDFs"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.done: Dict[str, Dict[str, Any]] = {}
+        if os.path.exists(path):
+            with open(path) as f:
+                self.done = json.load(f).get("done", {})
+
+    def record(self, key: str, **entry: Any) -> None:
+        self.done[key] = entry
+
+    def save(self) -> None:
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump({"done": self.done}, f)
+        os.replace(tmp_path, self.path)
+
+
+class Progress:
+    def __init__(self, total: int):
+        self.total = total
+        self.done = 0
+        self.failed = 0
+        self.started = time.monotonic()
+
+    def tick(self, failed: bool = False) -> None:
+        self.done += 1
+        self.failed += int(failed)
+
+    def line(self) -> str:
+        elapsed = max(time.monotonic() - self.started, 1e-6)
+        rate = self.done / elapsed
+        remaining = self.total - self.done
+        eta = remaining / rate if rate else float('inf')
+        eta_text = time.strftime('%H:%M:%S', time.gmtime(eta)) if eta != float('inf') else '--:--:--'
+        return (
+            f"[Ingest] {self.done}/{self.total} ({self.failed} failed) "
+            f"{rate:.2f} papers/s, {rate * 60:.1f} papers/min, ETA {eta_text}"
+        )
+
+
+def ingest(
+    path: str,
+    user_id: str,
+    workers: int,
+    llm_concurrency: int,
+    batch_size: int,
+    checkpoint_path: str,
+    retry_failed: bool = False,
+    precompute: bool = False,
+) -> int:
+    init_db()
+    storage = get_storage()
+    checkpoint = Checkpoint(checkpoint_path)
+
+    all_sources = list(iter_sources(path))
+    sources = []
+    for source in all_sources:
+        entry = checkpoint.done.get(source_key(source))
+        if entry is None or (retry_failed and "error" in entry):
+            sources.append(source)
+    skipped = len(all_sources) - len(sources)
+    print(f"[Ingest] {len(sources)} PDFs to ingest ({skipped} already done per {checkpoint_path})")
+    if not sources:
+        return 0
+
+    progress = Progress(len(sources))
+    # (source, paper row) pairs waiting for the next DB transaction
+    batch: List[Tuple[Source, Dict[str, Any]]] = []
+
+    def flush() -> None:
+        if not batch:
+            return
+        entries = list(batch)
+        batch.clear()
+
+        # Blobs are written right before their rows are committed, and removed again if the
+        # commit fails, so an interrupted run never leaves PDFs without a paper row
+        written: List[Tuple[Source, Dict[str, Any]]] = []
+        for source, row in entries:
+            try:
+                storage.put(row["file_path"], read_source(source), content_type='application/pdf')
+                written.append((source, row))
+            except Exception as e:
+                fail(source, f"Failed to persist PDF: {repr(e)}")
+        if not written:
+            checkpoint.save()
+            return
+
+        try:
+            upsert_papers([row for _, row in written])
+        except Exception as e:
+            for source, row in written:
+                try:
+                    storage.delete(row["file_path"])
+                except Exception as cleanup_error:
+                    print(f"[Ingest] Failed to remove {row['file_path']}: {repr(cleanup_error)}")
+                fail(source, f"Failed to save paper: {repr(e)}")
+            checkpoint.save()
+            return
+
+        for source, row in written:
+            publish_paper_meta(row["paper_id"], get_paper_meta(row["paper_id"]))
+            checkpoint.record(source_key(source), paper_id=row["paper_id"])
+            progress.tick()
+            if precompute:
+                in_flight[llm_pool.submit(
+                    precompute_explanations, row["paper_id"], row["text"], row["glossary"]
+                )] = ("precompute", source)
+        checkpoint.save()
+        print(progress.line())
+
+    def fail(source: Source, error: str) -> None:
+        print(f"[Ingest] Failed {source_key(source)}: {error}")
+        checkpoint.record(source_key(source), error=error)
+        progress.tick(failed=True)
+
+    # Keep a bounded number of PDFs in flight so memory stays flat on huge corpora
+    max_in_flight = max(workers * 2, llm_concurrency * 2)
+    pending_sources = iter(sources)
+    in_flight: Dict[Future, Tuple[str, Source]] = {}
+
+    with ProcessPoolExecutor(max_workers=workers) as parse_pool, \
+            ThreadPoolExecutor(max_workers=llm_concurrency, thread_name_prefix='ingest-llm') as llm_pool:
+
+        def refill() -> None:
+            while len(in_flight) < max_in_flight:
+                source = next(pending_sources, None)
+                if source is None:
+                    return
+                in_flight[parse_pool.submit(parse_source, source)] = ("parse", source)
+
+        refill()
+        try:
+            while in_flight:
+                finished, _ = wait(list(in_flight), return_when=FIRST_COMPLETED)
+                for future in finished:
+                    stage, source = in_flight.pop(future)
+                    if stage == "precompute":
+                        try:
+                            future.result()
+                        except Exception as e:
+                            print(f"[Ingest] Precompute failed for {source_key(source)}: {repr(e)}")
+                        continue
+                    if stage == "parse":
+                        try:
+                            parsed = future.result()
+                        except Exception as e:
+                            parsed = {"source": source, "error": repr(e)}
+                        if "error" in parsed:
+                            fail(source, parsed["error"])
+                        else:
+                            in_flight[llm_pool.submit(analyze_parsed, parsed)] = ("analyze", source)
+                        continue
+
+                    try:
+                        analyzed = future.result()
+                    except Exception as e:
+                        # Recorded as failed; re-run with --retry-failed
+                        fail(source, f"Document analysis failed: {repr(e)}")
+                        continue
+
+                    paper_id = str(uuid.uuid4())
+                    batch.append((source, {
+                        "paper_id": paper_id,
+                        "user_id": user_id,
+                        "title": analyzed["title"],
+                        "domain_tags": analyzed["domain_tags"],
+                        "glossary": analyzed["glossary"],
+                        "text": analyzed["text"],
+                        "file_path": pdf_key(paper_id),
+                        "pages": analyzed["pages"],
+                        "file_size": analyzed["file_size"],
+                    }))
+                    if len(batch) >= batch_size:
+                        flush()
+                refill()
+                if not in_flight:
+                    # Last partial batch; with --precompute this queues more work for the loop
+                    flush()
+        finally:
+            flush()
+            checkpoint.save()
+
+    print(progress.line())
+    return 1 if progress.failed else 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Bulk ingest a directory or zip archive of PDFs")
+    parser.add_argument("path", help="Directory, zip archive or single PDF")
+    parser.add_argument("--user-id", default="anonymous", help="Profile that will own the papers")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 2, help="PDF parsing processes")
+    parser.add_argument("--llm-concurrency", type=int, default=4, help="Concurrent analysis calls")
+    parser.add_argument("--batch-size", type=int, default=50, help="Papers per DB transaction")
+    parser.add_argument("--checkpoint", help="Checkpoint file (default: <path>.ingest.json next to the source)")
+    parser.add_argument("--retry-failed", action="store_true", help="Retry PDFs that failed in a previous run")
+    parser.add_argument("--precompute", action="store_true", help="Also precompute explanations for likely-selected terms")
+    args = parser.parse_args()
+
+    from dotenv import load_dotenv
+    load_dotenv()
+    if not os.getenv('OPENAI_API_KEY'):
+        print("Warning: OPENAI_API_KEY not found in environment variables")
+
+    checkpoint_path = args.checkpoint or f"{os.path.abspath(args.path).rstrip(os.sep)}.ingest.json"
+    return ingest(
+        args.path,
+        user_id=args.user_id,
+        workers=max(args.workers, 1),
+        llm_concurrency=max(args.llm_concurrency, 1),
+        batch_size=max(args.batch_size, 1),
+        checkpoint_path=checkpoint_path,
+        retry_failed=args.retry_failed,
+        precompute=args.precompute,
+    )
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,11 +1,78 @@
 import os
+import re
 from openai import OpenAI
 from typing import List, Optional, Dict, Any, Tuple
 from abc import ABC, abstractmethod
-from prompts import DOCUMENT_ANALYZER_SYSTEM_PROMPT
+from prompts import DOCUMENT_ANALYZER_SYSTEM_PROMPT, BATCH_TERM_EXPLANATION_PROMPT, CONTINUE_GLOSSARY_PROMPT
 import json
 
 
+_FENCE_RE = re.compile(r"^\s*```[a-zA-Z]*\s*|\s*```\s*$")
+_DOMAINS_RE = re.compile(r'"domains"\s*:\s*\[(.*?)(?:\]|$)', re.DOTALL)
+_STRING_RE = re.compile(r'"((?:[^"\\]|\\.)*)"')
+_PAIR_RE = re.compile(r'\s*,?\s*"((?:[^"\\]|\\.)*)"\s*:\s*"((?:[^"\\]|\\.)*)"')
+
+
+def _unescape(value: str) -> str:
+    try:
+        return json.loads(f'"{value}"')
+    except json.JSONDecodeError:
+        return value
+
+
+def parse_json_response(response_text: str) -> Optional[Any]:
+    """Parse a JSON reply, tolerating markdown fences and prose around the object"""
+    text = _FENCE_RE.sub("", response_text.strip())
+    start = text.find("{")
+    if start == -1:
+        return None
+    try:
+        result, _ = json.JSONDecoder().raw_decode(text[start:])
+        return result
+    except json.JSONDecodeError:
+        return None
+
+
+def _recover_pairs(text: str, pos: int) -> Dict[str, str]:
+    """Complete "key": "value" pairs of a possibly truncated JSON object, starting inside it at pos"""
+    pairs: Dict[str, str] = {}
+    while True:
+        pair = _PAIR_RE.match(text, pos)
+        if not pair:
+            return pairs
+        pairs[_unescape(pair.group(1))] = _unescape(pair.group(2))
+        pos = pair.end()
+
+
+def parse_analysis_response(response_text: str) -> Tuple[List[str], Dict[str, str], bool]:
+    """
+    Parse a DocumentAnalyzer reply into (domains, glossary, complete).
+    When the JSON is cut off (e.g. at max_output_tokens), every complete
+    "term": "definition" pair is still recovered and complete is False.
+    """
+    result = parse_json_response(response_text)
+    if isinstance(result, dict):
+        domains = result.get("domains", [])
+        glossary = result.get("glossary", {})  # dict {term: definition}
+        return (
+            domains if isinstance(domains, list) else [],
+            glossary if isinstance(glossary, dict) else {},
+            True,
+        )
+
+    text = _FENCE_RE.sub("", response_text.strip())
+    domains: List[str] = []
+    match = _DOMAINS_RE.search(text)
+    if match:
+        domains = [_unescape(d) for d in _STRING_RE.findall(match.group(1))]
+
+    glossary: Dict[str, str] = {}
+    glossary_start = re.search(r'"glossary"\s*:\s*\{', text)
+    if glossary_start:
+        glossary = _recover_pairs(text, glossary_start.end())
+    return domains, glossary, False
+
+
 class BaseLLMAdapter(ABC):
     """Base class for LLM adapters"""
 
@@ -18,16 +85,36 @@ class BaseLLMAdapter(ABC):
         messages: List[Dict[str, str]],
         max_tokens: int = 200,
         temperature: float = 0.3,
+        json_mode: bool = False,
     ) -> str:
         """Make a request to the LLM"""
+        response_text, _ = self._make_request_with_status(messages, max_tokens, temperature, json_mode)
+        return response_text
+
+    def _make_request_with_status(
+        self,
+        messages: List[Dict[str, str]],
+        max_tokens: int = 200,
+        temperature: float = 0.3,
+        json_mode: bool = False,
+    ) -> Tuple[str, bool]:
+        """Make a request to the LLM; returns (text, truncated at max_tokens)"""
         try:
+            kwargs: Dict[str, Any] = {}
+            if json_mode:
+                kwargs["text"] = {"format": {"type": "json_object"}}
             response = self.client.responses.create(
                 model=self.model,
                 input=messages,
                 max_output_tokens=max_tokens,
                 temperature=temperature,
+                **kwargs,
+            )
+            truncated = (
+                getattr(response, "status", None) == "incomplete"
+                and getattr(getattr(response, "incomplete_details", None), "reason", None) == "max_output_tokens"
             )
-            return response.output[0].content[0].text.strip()
+            return response.output[0].content[0].text.strip(), truncated
         except Exception as e:
             print(f"LLM request error: {e}")
             raise
@@ -36,6 +123,13 @@ class BaseLLMAdapter(ABC):
 class DocumentAnalyzer(BaseLLMAdapter):
     """Specialized agent for comprehensive document analysis - domain tagging and glossary extraction"""
 
+    # Only this much leading text is sent to the model
+    max_text_length = 8000
+    max_tokens = 2000
+    # Follow-up requests for the rest of a truncated glossary
+    max_continuations = 2
+    continuation_max_tokens = 1500
+
     def analyze_document(
         self, 
         title: str, 
@@ -43,9 +137,8 @@ class DocumentAnalyzer(BaseLLMAdapter):
     ) -> Tuple[List[str], Dict[str, str]]:
         """Analyze document to extract both domain tags and glossary in a single LLM call"""
         # Truncate text if too long
-        max_text_length = 8000
-        if len(full_text) > max_text_length:
-            full_text = full_text[:max_text_length] + "..."
+        if len(full_text) > self.max_text_length:
+            full_text = full_text[:self.max_text_length] + "..."
 
         messages = [
             {"role": "system", "content": DOCUMENT_ANALYZER_SYSTEM_PROMPT},
@@ -55,17 +148,47 @@ class DocumentAnalyzer(BaseLLMAdapter):
             },
         ]
 
-        response_text = self._make_request(messages, max_tokens=2000, temperature=0.3)
+        response_text, truncated = self._make_request_with_status(
+            messages, max_tokens=self.max_tokens, temperature=0.3, json_mode=True
+        )
+        domains, glossary, complete = parse_analysis_response(response_text)
 
-        try:
-            result = json.loads(response_text)
-            domains = result.get("domains", [])
-            glossary = result.get("glossary", {})  # dict {term: definition}
-            return domains, glossary
-        except json.JSONDecodeError as e:
-            print(f"Error parsing JSON response: {e}")
+        # Ask only for what was cut off instead of repeating the whole analysis
+        continuations = 0
+        while not complete and continuations < self.max_continuations:
+            if not truncated and not glossary:
+                # Not cut off, just unusable; another call would not help
+                break
+            continuations += 1
+            print(f"Analysis response truncated with {len(glossary)} terms; requesting continuation {continuations}")
+            try:
+                response_text, truncated = self._make_request_with_status(
+                    messages + [
+                        {"role": "assistant", "content": response_text},
+                        {"role": "user", "content": CONTINUE_GLOSSARY_PROMPT.format(
+                            terms=json.dumps(list(glossary)),
+                            domains_note="" if domains else " Also include the \"domains\" list.",
+                        )},
+                    ],
+                    max_tokens=self.continuation_max_tokens,
+                    temperature=0.3,
+                    json_mode=True,
+                )
+            except Exception as e:
+                print(f"Continuation request failed, keeping partial glossary: {e}")
+                break
+            more_domains, more_glossary, complete = parse_analysis_response(response_text)
+            domains = domains or more_domains
+            for term, definition in more_glossary.items():
+                glossary.setdefault(term, definition)
+
+        if not domains and not glossary:
+            # Nothing usable at all; fail like an unparseable reply so callers report it
             print(f"Raw response: {response_text}")
-            raise
+            raise ValueError("Document analysis returned no domains or glossary")
+        if not complete:
+            print(f"Using partial analysis: {len(domains)} domains, {len(glossary)} terms")
+        return domains, glossary
 
 
 class TermExplainer(BaseLLMAdapter):
@@ -83,3 +206,27 @@ class TermExplainer(BaseLLMAdapter):
         ]
 
         return self._make_request(messages, max_tokens=200, temperature=0.3)
+
+    def explain_terms(self, terms: List[str], context: Optional[str] = None) -> Dict[str, str]:
+        """Explain several terms in a single LLM call; returns {term: explanation}"""
+        if not terms:
+            return {}
+        context_prompt = f"\n\nDocument context:\n{context}" if context else ""
+        term_list = "\n".join(f"- {t}" for t in terms)
+        messages = [
+            {"role": "system", "content": BATCH_TERM_EXPLANATION_PROMPT},
+            {"role": "user", "content": f"Terms:\n{term_list}{context_prompt}"},
+        ]
+
+        response_text = self._make_request(messages, max_tokens=120 * len(terms), temperature=0.3, json_mode=True)
+
+        result = parse_json_response(response_text)
+        if not isinstance(result, dict):
+            # Likely cut off at max_tokens: keep every explanation that did arrive whole
+            text = _FENCE_RE.sub("", response_text.strip())
+            start = text.find("{")
+            result = _recover_pairs(text, start + 1) if start != -1 else {}
+            if not result:
+                print(f"Error parsing batch explanation response: {response_text[:200]}")
+                return {}
+        return {str(k): str(v).strip() for k, v in result.items() if v}
@@ -1,7 +1,11 @@
+import json
 import os
+import time
 import uuid
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from flask import Flask, request, jsonify, send_file, send_from_directory
+from typing import Dict, Tuple
+from flask import Flask, request, jsonify, redirect, send_file, send_from_directory
 from flask_cors import CORS
 from werkzeug.utils import secure_filename
 
@@ -17,28 +21,209 @@ from db import (
     get_user_papers_with_paths,
     delete_user_and_papers,
     delete_paper,
+    import_paper,
+    get_user,
+    import_user,
 )
-from pdf_io import extract_text_from_pdf
+from pdf_io import PdfPageStream
 from llm import DocumentAnalyzer, TermExplainer
+from precompute import normalize_term, schedule_precompute
+from http_utils import compress_response, json_response
+from storage import (
+    UPLOAD_FOLDER,
+    get_storage,
+    pdf_key,
+    meta_key,
+    publish_paper_meta,
+    publish_paper_deleted,
+    paper_deleted,
+    fetch_paper_meta,
+    list_shared_papers,
+    publish_user,
+    publish_user_deleted,
+    list_shared_users,
+    fetch_user,
+)
+from profiling import init_profiling, set_paper_id, stage
 
 app = Flask(__name__)
-CORS(app)
+# Let browser clients read the cache validator and profiling headers
+CORS(app, expose_headers=['ETag', 'X-Glossify-Profile-File'])
+init_profiling(app)
+app.after_request(compress_response)
 try:
     init_db()
 except Exception as e:
     print(f"DB init error at startup: {e}")
 
-# Configure upload settings
-UPLOAD_FOLDER = os.environ.get('GLOSSIFY_UPLOADS', '/tmp/glossify_uploads')
+# Configure upload settings (PDFs themselves go through the storage backend)
 ALLOWED_EXTENSIONS = {'pdf'}
 
 app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
 app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max file size
 
+# Document analysis runs here so it overlaps with extraction of the remaining pages
+analysis_executor = ThreadPoolExecutor(
+    max_workers=int(os.environ.get('GLOSSIFY_ANALYSIS_WORKERS', '4')),
+    thread_name_prefix='analysis',
+)
+
+# How long a replica trusts its last look at a paper's shared mirror (seconds)
+META_SYNC_TTL = float(os.environ.get('GLOSSIFY_META_SYNC_TTL', '30'))
+
 def allowed_file(filename):
     # Check if the file name ends with the allowed extentions
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
+def _analyze_document(title, text):
+    document_analyzer = DocumentAnalyzer()
+    return document_analyzer.analyze_document(title, text)
+
+# Mirror version each paper's local row was last synced from (shared storage only)
+_synced_meta_versions: Dict[str, str] = {}
+# paper_id -> (monotonic time of the last mirror check, whether the paper still exists)
+_meta_checks: Dict[str, Tuple[float, bool]] = {}
+
+def _sync_shared_paper(paper_id):
+    """
+    On a shared backend the mirror is the source of truth: drop local copies of papers
+    another replica deleted and refresh rows it changed. Returns False if the paper is gone.
+    The result is reused for META_SYNC_TTL seconds so reads rarely wait on the object store.
+    """
+    storage = get_storage()
+    if not storage.shared:
+        return True
+    now = time.monotonic()
+    checked = _meta_checks.get(paper_id)
+    if checked and now - checked[0] < META_SYNC_TTL:
+        return checked[1]
+    try:
+        exists = _check_shared_paper(storage, paper_id)
+    except Exception as e:
+        # Object store unreachable: serve whatever this replica has, retry after the TTL
+        print(f"Mirror check failed for {paper_id}: {repr(e)}")
+        exists = True
+    _meta_checks[paper_id] = (now, exists)
+    return exists
+
+def _check_shared_paper(storage, paper_id):
+    version = storage.version(meta_key(paper_id))
+    if version is None:
+        if not paper_deleted(paper_id):
+            # Never mirrored (e.g. uploaded before shared storage was enabled)
+            return True
+        _drop_local_paper(storage, paper_id)
+        return False
+    if _synced_meta_versions.get(paper_id) != version:
+        meta = fetch_paper_meta(paper_id)
+        if meta:
+            import_paper(meta)
+            paper_data = store.get_paper(paper_id)
+            if paper_data:
+                paper_data.explanations = json.loads(meta.get('explanations') or '{}')
+        _synced_meta_versions[paper_id] = version
+    return True
+
+def _drop_local_paper(storage, paper_id):
+    """Forget a paper another replica deleted: DB row, store entry and cached PDF"""
+    meta = get_paper_meta(paper_id)
+    if meta:
+        delete_paper(paper_id)
+        if meta.get('file_path'):
+            storage.evict_local(meta['file_path'])
+    store.papers.pop(paper_id, None)
+    _synced_meta_versions.pop(paper_id, None)
+
+# Listing ("users" or "papers:<user_id>") -> monotonic time this replica last synced it
+_listing_syncs: Dict[str, float] = {}
+
+def _listing_sync_due(key, force=False):
+    now = time.monotonic()
+    last = _listing_syncs.get(key)
+    if not force and last is not None and now - last < META_SYNC_TTL:
+        return False
+    _listing_syncs[key] = now
+    return True
+
+def _sync_shared_users(force=False):
+    """Bring this replica's users table in line with the profiles in shared storage"""
+    if not get_storage().shared or not _listing_sync_due('users', force):
+        return
+    try:
+        shared = list_shared_users()
+        live, deleted = set(shared['live']), set(shared['deleted'])
+        local = {u['id']: u for u in list_users()}
+        for user_id in live - set(local):
+            user = fetch_user(user_id)
+            if user:
+                import_user(user)
+        for user_id, user in local.items():
+            if user_id in deleted:
+                delete_user_and_papers(user_id)
+            elif user_id not in live:
+                # Created before shared storage was enabled
+                publish_user(user)
+    except Exception as e:
+        print(f"User sync failed, serving local profiles: {repr(e)}")
+
+def _sync_shared_user_papers(user_id, force=False):
+    """Bring this replica's rows for a user's library in line with shared storage"""
+    storage = get_storage()
+    if not storage.shared or not _listing_sync_due(f'papers:{user_id}', force):
+        return
+    try:
+        listed = set(list_shared_papers(user_id))
+        local = {p['paper_id'] for p in list_papers(user_id)}
+        for paper_id in listed - local:
+            meta = fetch_paper_meta(paper_id)
+            if meta:
+                import_paper(meta)
+        for paper_id in local - listed:
+            if paper_deleted(paper_id):
+                _drop_local_paper(storage, paper_id)
+            else:
+                # Uploaded before shared storage was enabled
+                publish_paper_meta(paper_id, get_paper_meta(paper_id))
+    except Exception as e:
+        print(f"Library sync failed for {user_id}, serving local papers: {repr(e)}")
+
+def _mark_meta_synced(paper_id):
+    """Record that this replica's row matches the mirror it just published"""
+    storage = get_storage()
+    if storage.shared:
+        version = storage.version(meta_key(paper_id))
+        if version:
+            _synced_meta_versions[paper_id] = version
+            _meta_checks[paper_id] = (time.monotonic(), True)
+
+def _load_paper_meta(paper_id):
+    """DB row for a paper, falling back to metadata mirrored by another replica"""
+    if not _sync_shared_paper(paper_id):
+        return None
+    meta = get_paper_meta(paper_id)
+    if meta is None:
+        meta = fetch_paper_meta(paper_id)
+        if meta:
+            import_paper(meta)
+    return meta
+
+def _delete_paper_files(paper_id, file_path, user_id=None):
+    """Best-effort removal of a paper's stored PDF and mirrored metadata"""
+    storage = get_storage()
+    store.papers.pop(paper_id, None)
+    _meta_checks[paper_id] = (time.monotonic(), False)
+    try:
+        publish_paper_deleted(paper_id, user_id)
+    except Exception as e:
+        print(f"Failed to publish deletion of {paper_id}: {repr(e)}")
+    for key in (file_path, meta_key(paper_id) if storage.shared else None):
+        if not key:
+            continue
+        try:
+            storage.delete(key)
+        except Exception as e:
+            print(f"Failed to delete {key}: {repr(e)}")
+
 @app.route('/upload', methods=['POST'])
 def upload_file():
     """Upload PDF file and extract text"""
@@ -57,48 +242,61 @@ def upload_file():
         file_content = file.read()
         file_size = len(file_content)
         
-        # Extract text from PDF
-        text, title_guess = extract_text_from_pdf(file_content)
-        
-        if not text:
+        # Extract leading pages until there is enough text for analysis
+        stream = PdfPageStream(file_content)
+        pages_iter = iter(stream)
+        leading_parts = []
+        leading_length = 0
+        with stage("extract_leading"):
+            for segment in pages_iter:
+                leading_parts.append(segment)
+                leading_length += len(segment)
+                if leading_length > DocumentAnalyzer.max_text_length:
+                    break
+        leading_text = "".join(leading_parts)
+
+        if not leading_text:
             return jsonify({'error': 'Could not extract text from PDF'}), 400
-        
+
+        title_guess = stream.title_guess(leading_text)
+
         # Generate paper ID
         paper_id = str(uuid.uuid4())
+        set_paper_id(paper_id)
         user_id = request.form.get('user_id') or request.args.get('user_id') or 'anonymous'
-        
-        # Analyze document to extract both domains and glossary
+
+        # Analyze document to extract both domains and glossary, while the
+        # remaining pages are extracted on this thread
+        analysis = analysis_executor.submit(
+            _analyze_document,
+            title_guess or "Untitled Document",
+            leading_text,
+        )
+        with stage("extract_rest"):
+            text = leading_text + "".join(pages_iter)
+
         domain_tags = []
         glossary = {}
         try:
-            document_analyzer = DocumentAnalyzer()
-            domain_tags, glossary = document_analyzer.analyze_document(
-                title_guess or "Untitled Document", 
-                text
-            )
+            with stage("analysis_wait"):
+                domain_tags, glossary = analysis.result()
         except Exception as e:
             print(f"[Upload] Document analysis failed: {repr(e)}")
             return jsonify({
                 "error": "Document analysis failed",
                 "details": str(e)
             }), 502 
-        # Store PDF to disk
+        # Store PDF in the storage backend
         try:
-            os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
-            file_path = os.path.join(app.config['UPLOAD_FOLDER'], f"{paper_id}.pdf")
-            with open(file_path, 'wb') as f:
-                f.write(file_content)
+            file_path = pdf_key(paper_id)
+            with stage("store_pdf"):
+                get_storage().put(file_path, file_content, content_type='application/pdf')
         except Exception as e:
             print(f"[Upload] Failed to save PDF: {repr(e)}")
             return jsonify({"error": "Failed to persist PDF"}), 500
 
-        # Page count (best-effort)
-        try:
-            from pypdf import PdfReader
-            import io
-            pages = len(PdfReader(io.BytesIO(file_content)).pages)
-        except Exception:
-            pages = None
+        # Page count (known once extraction has finished)
+        pages = stream.page_count
 
         # Store paper data with both domains and glossary
         paper_data = PaperData(
@@ -112,20 +310,29 @@ def upload_file():
         store.store_paper(paper_data)
         # Persist to DB
         try:
-            upsert_paper(
-                paper_id=paper_id,
-                user_id=user_id,
-                title=paper_data.title,
-                domain_tags=paper_data.domain_tags,
-                glossary=paper_data.glossary,
-                text=text,
-                file_path=file_path,
-                pages=pages,
-                file_size=file_size,
-            )
+            with stage("persist"):
+                upsert_paper(
+                    paper_id=paper_id,
+                    user_id=user_id,
+                    title=paper_data.title,
+                    domain_tags=paper_data.domain_tags,
+                    glossary=paper_data.glossary,
+                    text=text,
+                    file_path=file_path,
+                    pages=pages,
+                    file_size=file_size,
+                )
+                publish_paper_meta(paper_id, get_paper_meta(paper_id))
+                _mark_meta_synced(paper_id)
         except Exception as e:
             print(f"[Upload] Failed to persist metadata: {repr(e)}")
 
+        # Warm explanations for likely selections in the background
+        try:
+            schedule_precompute(paper_id, text, glossary)
+        except Exception as e:
+            print(f"[Upload] Failed to schedule precompute: {repr(e)}")
+
         print("SAVED", store)
         
         resp = UploadResponse(
@@ -135,12 +342,41 @@ def upload_file():
             glossary=glossary
         )
         
-        return jsonify(resp.model_dump())
+        return json_response(resp.model_dump())
         
     except Exception as e:
         print(f"Error in upload: {e}")
         return jsonify({'error': 'Internal server error'}), 500
 
+def _glossary_response(paper_id):
+    """GlossaryResponse payload for a paper, or None if it does not exist"""
+    # Get paper data
+    paper_data = store.get_paper(paper_id)
+    if paper_data and not _sync_shared_paper(paper_id):
+        return None
+    glossary = None
+    if paper_data and paper_data.glossary:
+        glossary = paper_data.glossary
+    else:
+        # Fallback to DB
+        meta = _load_paper_meta(paper_id)
+        if not meta:
+            return None
+        try:
+            import json as _json
+            glossary = (_json.loads(meta.get('glossary') or '{}'))
+        except Exception:
+            glossary = {}
+
+    if not isinstance(glossary, dict):
+        glossary = {}
+
+    return GlossaryResponse(
+        glossary=glossary,
+        total_terms=len(glossary)
+    ).model_dump()
+
+
 @app.route('/get_glossary', methods=['POST'])
 def get_glossary_endpoint():
     """Get glossary for a paper (now generated during upload)"""
@@ -151,35 +387,29 @@ def get_glossary_endpoint():
         if not paper_id:
             return jsonify({'error': 'paper_id is required'}), 400
         
-        # Get paper data
-        paper_data = store.get_paper(paper_id)
-        glossary = None
-        if paper_data and paper_data.glossary:
-            glossary = paper_data.glossary
-        else:
-            # Fallback to DB
-            meta = get_paper_meta(paper_id)
-            if not meta:
-                return jsonify({'error': 'Paper not found'}), 404
-            try:
-                import json as _json
-                glossary = (_json.loads(meta.get('glossary') or '{}'))
-            except Exception:
-                glossary = {}
-
-        if not isinstance(glossary, dict):
-            glossary = {}
-
-        resp = GlossaryResponse(
-            glossary=glossary,
-            total_terms=len(glossary)
-        )
-        return jsonify(resp.model_dump()), 200
+        payload = _glossary_response(paper_id)
+        if payload is None:
+            return jsonify({'error': 'Paper not found'}), 404
+        return json_response(payload)
         
     except Exception as e:
         print(f"Error getting glossary: {e}")
         return jsonify({'error': 'Internal server error'}), 500
 
+
+# Cacheable variant of /get_glossary: clients revalidate with If-None-Match
+@app.route('/paper/<paper_id>/glossary', methods=['GET'])
+def get_paper_glossary(paper_id: str):
+    try:
+        payload = _glossary_response(paper_id)
+        if payload is None:
+            return jsonify({'error': 'Paper not found'}), 404
+        return json_response(payload, etag=True)
+    except Exception as e:
+        print(f"get_paper_glossary error: {e}")
+        return jsonify({'error': 'Internal server error'}), 500
+
+
 @app.route('/explain', methods=['POST'])
 def explain_term():
     """Explain a term from the paper"""
@@ -194,10 +424,13 @@ def explain_term():
         
         # Get paper data
         paper_data = store.get_paper(paper_id)
+        if paper_data and not _sync_shared_paper(paper_id):
+            return jsonify({'error': 'Paper not found'}), 404
         if not paper_data:
             # Try DB
             try:
-                meta = get_paper_meta(paper_id)
+                with stage("load_paper"):
+                    meta = _load_paper_meta(paper_id)
                 if not meta:
                     return jsonify({'error': 'Paper not found'}), 404
                 paper_data = PaperData(
@@ -206,6 +439,7 @@ def explain_term():
                     text=meta.get('text') or '',
                     domain_tags=(meta.get('domain_tags') and __import__('json').loads(meta['domain_tags'])) or [],
                     glossary=(meta.get('glossary') and __import__('json').loads(meta['glossary'])) or {},
+                    explanations=(meta.get('explanations') and __import__('json').loads(meta['explanations'])) or {},
                     created_at=datetime.now(),
                 )
             except Exception:
@@ -231,11 +465,18 @@ def explain_term():
             definition = paper_data.glossary[term]
             source = "Doc (Glossary)"
 
+        # Precomputed explanation for a likely selection
+        if not definition and not force_ai and paper_data.explanations:
+            definition = paper_data.explanations.get(normalize_term(term))
+            if definition:
+                source = "LLM (Precomputed)"
+
         # If not in glossary or forcing AI, use LLM
         if not definition:
             try:
-                term_explainer = TermExplainer()
-                definition = term_explainer.explain_term(term, paper_data.text[:1000])  # Use context
+                with stage("llm"):
+                    term_explainer = TermExplainer()
+                    definition = term_explainer.explain_term(term, paper_data.text[:1000])  # Use context
             except Exception as e:
                 print(f"Error explaining term: {e}")
                 definition = f"Unable to explain '{term}' at this time."
@@ -245,7 +486,7 @@ def explain_term():
             source=source,
             domain=paper_data.domain_tags[0] if paper_data.domain_tags else None
         )
-        return jsonify(resp.model_dump()), 200   
+        return json_response(resp.model_dump())
         
     except Exception as e:
         print(f"Error explaining term: {e}")
@@ -280,13 +521,23 @@ def serve_frontend(path: str):
 @app.route('/paper/<paper_id>/file', methods=['GET'])
 def get_paper_file(paper_id: str):
     try:
-        meta = get_paper_meta(paper_id)
+        meta = _load_paper_meta(paper_id)
         if not meta:
             return jsonify({'error': 'Paper not found'}), 404
         file_path = meta.get('file_path')
-        if not file_path or not os.path.exists(file_path):
+        if not file_path:
+            return jsonify({'error': 'File not found'}), 404
+        storage = get_storage()
+        # Let the client download straight from the object store when possible
+        url = storage.presigned_url(file_path)
+        if url:
+            return redirect(url)
+        try:
+            with stage("storage_read"):
+                local_path = storage.local_path(file_path)
+        except FileNotFoundError:
             return jsonify({'error': 'File not found'}), 404
-        return send_file(file_path, mimetype='application/pdf', as_attachment=False, download_name=f"{paper_id}.pdf")
+        return send_file(local_path, mimetype='application/pdf', as_attachment=False, download_name=f"{paper_id}.pdf")
     except Exception as e:
         print(f"get_paper_file error: {e}")
         return jsonify({'error': 'Internal server error'}), 500
@@ -296,7 +547,7 @@ def get_paper_file(paper_id: str):
 @app.route('/paper/<paper_id>/meta', methods=['GET'])
 def get_paper_metadata(paper_id: str):
     try:
-        meta = get_paper_meta(paper_id)
+        meta = _load_paper_meta(paper_id)
         if not meta:
             return jsonify({'error': 'Paper not found'}), 404
         # decode JSON fields
@@ -306,14 +557,14 @@ def get_paper_metadata(paper_id: str):
             domain_tags = _json.loads(meta.get('domain_tags') or '[]')
         except Exception:
             domain_tags = []
-        return jsonify({
+        return json_response({
             'paper_id': meta['paper_id'],
             'title': meta['title'],
             'domain_tags': domain_tags,
             'file_size': meta.get('file_size'),
             'pages': meta.get('pages'),
             'created_at': meta.get('created_at'),
-        })
+        }, etag=True)
     except Exception as e:
         print(f"get_paper_metadata error: {e}")
         return jsonify({'error': 'Internal server error'}), 500
@@ -323,16 +574,11 @@ def get_paper_metadata(paper_id: str):
 @app.route('/paper/<paper_id>', methods=['DELETE'])
 def delete_paper_endpoint(paper_id: str):
     try:
-        meta = get_paper_meta(paper_id)
+        meta = _load_paper_meta(paper_id)
         if not meta:
             return ('', 204)
-        file_path = meta.get('file_path')
-        try:
-            if file_path and os.path.exists(file_path):
-                os.remove(file_path)
-        except Exception:
-            # Best-effort: continue even if file removal fails
-            pass
+        # Best-effort: continue even if file removal fails
+        _delete_paper_files(paper_id, meta.get('file_path'), meta.get('user_id'))
         delete_paper(paper_id)
         return ('', 204)
     except Exception as e:
@@ -343,6 +589,7 @@ def delete_paper_endpoint(paper_id: str):
 @app.route('/users', methods=['GET'])
 def users_list():
     try:
+        _sync_shared_users()
         return jsonify({"users": list_users()})
     except Exception as e:
         print(f"users_list error: {e}")
@@ -359,6 +606,10 @@ def users_create():
         uid = str(uuid.uuid4())
         avatar_url = (data or {}).get('avatar_url')
         u = create_user(uid, name, avatar_url)
+        try:
+            publish_user(get_user(uid))
+        except Exception as e:
+            print(f"Failed to publish user {uid}: {repr(e)}")
         return jsonify(u)
     except Exception as e:
         print(f"users_create error: {e}")
@@ -371,6 +622,7 @@ def papers_list():
         user_id = request.args.get('user_id')
         if not user_id:
             return jsonify({"error": "user_id is required"}), 400
+        _sync_shared_user_papers(user_id)
         papers = list_papers(user_id)
         return jsonify({"papers": papers})
     except Exception as e:
@@ -381,18 +633,16 @@ def papers_list():
 @app.route('/users/<user_id>', methods=['DELETE'])
 def users_delete(user_id: str):
     try:
+        # Include papers this user uploaded through other replicas
+        _sync_shared_user_papers(user_id, force=True)
         # Collect file paths to remove from disk
         items = get_user_papers_with_paths(user_id)
         # Delete DB records
         delete_user_and_papers(user_id)
         # Remove files best-effort
         for it in items:
-            fp = it.get('file_path')
-            try:
-                if fp and os.path.exists(fp):
-                    os.remove(fp)
-            except Exception:
-                pass
+            _delete_paper_files(it['paper_id'], it.get('file_path'), user_id)
+        publish_user_deleted(user_id)
         return ('', 204)
     except Exception as e:
         print(f"users_delete error: {e}")
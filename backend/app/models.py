@@ -28,4 +28,5 @@ class PaperData(BaseModel):
     text: str
     domain_tags: Optional[List[str]] = None
     glossary: Optional[Dict[str, str]] = None  
+    explanations: Optional[Dict[str, str]] = None  # precomputed {normalized term: explanation}
     created_at: datetime
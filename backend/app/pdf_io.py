@@ -1,52 +1,294 @@
 import io
+import os
 import re
-from typing import Tuple, Optional
-from pypdf import PdfReader
+import threading
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Type
 
-def extract_text_from_pdf(file_content: bytes) -> Tuple[str, str, Optional[str]]:
+# Engine order used when GLOSSIFY_PDF_ENGINE is not set; pypdf is always the last fallback
+DEFAULT_PDF_ENGINE = "pypdf"
+PDF_ENGINE = os.environ.get("GLOSSIFY_PDF_ENGINE", DEFAULT_PDF_ENGINE)
+
+_HYPHEN_BREAK_RE = re.compile(r'-\s*\n\s*')
+_TRAILING_HYPHEN_RE = re.compile(r'-\s*$')
+_WHITESPACE_RE = re.compile(r'\s+')
+
+
+class PdfEngine(ABC):
+    """Base class for PDF text extraction engines"""
+
+    name = "base"
+
+    @abstractmethod
+    def open(self, file_content: bytes) -> Any:
+        """Parse PDF bytes into an engine-specific document handle"""
+
+    @abstractmethod
+    def page_count(self, doc: Any) -> int:
+        """Number of pages in the document"""
+
+    @abstractmethod
+    def page_text(self, doc: Any, index: int) -> str:
+        """Raw text of a single page"""
+
+    def metadata_title(self, doc: Any) -> Optional[str]:
+        """Title from document metadata, if any"""
+        return None
+
+    def close(self, doc: Any) -> None:
+        """Release resources held by the document handle"""
+
+
+class PypdfEngine(PdfEngine):
+    """Pure-Python extraction with pypdf (default)"""
+
+    name = "pypdf"
+
+    def __init__(self):
+        from pypdf import PdfReader
+        self._reader_cls = PdfReader
+
+    def open(self, file_content: bytes) -> Any:
+        return self._reader_cls(io.BytesIO(file_content))
+
+    def page_count(self, doc: Any) -> int:
+        return len(doc.pages)
+
+    def page_text(self, doc: Any, index: int) -> str:
+        return doc.pages[index].extract_text() or ""
+
+    def metadata_title(self, doc: Any) -> Optional[str]:
+        if doc.metadata and doc.metadata.title:
+            return doc.metadata.title
+        return None
+
+
+# PDFium is not thread-safe: every call into it, from any thread, must hold this lock
+_PDFIUM_LOCK = threading.Lock()
+
+
+class PdfiumEngine(PdfEngine):
+    """Native extraction with pypdfium2 (PDFium bindings), much faster on large PDFs"""
+
+    name = "pypdfium2"
+
+    def __init__(self):
+        import pypdfium2
+        self._pdfium = pypdfium2
+
+    def open(self, file_content: bytes) -> Any:
+        with _PDFIUM_LOCK:
+            return self._pdfium.PdfDocument(file_content)
+
+    def page_count(self, doc: Any) -> int:
+        with _PDFIUM_LOCK:
+            return len(doc)
+
+    def page_text(self, doc: Any, index: int) -> str:
+        # Held per page, so concurrent extractions interleave instead of queueing whole documents
+        with _PDFIUM_LOCK:
+            page = doc[index]
+            textpage = page.get_textpage()
+            try:
+                text = textpage.get_text_range() or ""
+            finally:
+                textpage.close()
+                page.close()
+        # PDFium replaces a hyphenated line break with U+FFFE and uses CRLF line ends;
+        # restore both so the shared de-hyphenation treats it like pypdf output
+        return text.replace("\r\n", "\n").replace("\ufffe", "-\n")
+
+    def metadata_title(self, doc: Any) -> Optional[str]:
+        with _PDFIUM_LOCK:
+            return doc.get_metadata_dict().get("Title") or None
+
+    def close(self, doc: Any) -> None:
+        with _PDFIUM_LOCK:
+            doc.close()
+
+
+class PdfminerEngine(PdfEngine):
+    """Layout-aware extraction with pdfminer.six"""
+
+    name = "pdfminer"
+
+    def __init__(self):
+        from pdfminer.converter import TextConverter
+        from pdfminer.layout import LAParams
+        from pdfminer.pdfdocument import PDFDocument
+        from pdfminer.pdfinterp import PDFPageInterpreter, PDFResourceManager
+        from pdfminer.pdfpage import PDFPage
+        from pdfminer.pdfparser import PDFParser
+        self._converter_cls = TextConverter
+        self._laparams_cls = LAParams
+        self._document_cls = PDFDocument
+        self._interpreter_cls = PDFPageInterpreter
+        self._rsrcmgr_cls = PDFResourceManager
+        self._page_cls = PDFPage
+        self._parser_cls = PDFParser
+
+    def open(self, file_content: bytes) -> Any:
+        document = self._document_cls(self._parser_cls(io.BytesIO(file_content)))
+        pages = list(self._page_cls.create_pages(document))
+        return {"document": document, "pages": pages, "rsrcmgr": self._rsrcmgr_cls()}
+
+    def page_count(self, doc: Any) -> int:
+        return len(doc["pages"])
+
+    def page_text(self, doc: Any, index: int) -> str:
+        out = io.StringIO()
+        device = self._converter_cls(doc["rsrcmgr"], out, laparams=self._laparams_cls())
+        try:
+            self._interpreter_cls(doc["rsrcmgr"], device).process_page(doc["pages"][index])
+        finally:
+            device.close()
+        return out.getvalue()
+
+    def metadata_title(self, doc: Any) -> Optional[str]:
+        for info in doc["document"].info or []:
+            title = info.get("Title")
+            if isinstance(title, bytes):
+                title = title.decode("utf-8", errors="ignore")
+            if title:
+                return str(title)
+        return None
+
+
+PDF_ENGINES: Dict[str, Type[PdfEngine]] = {
+    PypdfEngine.name: PypdfEngine,
+    PdfiumEngine.name: PdfiumEngine,
+    PdfminerEngine.name: PdfminerEngine,
+}
+
+
+def get_engines(engine: Optional[str] = None) -> List[PdfEngine]:
     """
-    Extract text from PDF file content.
-    Returns (full_text, first_page_text, title_guess)
+    Resolve the engine fallback chain from a comma-separated list of engine names
+    (defaults to GLOSSIFY_PDF_ENGINE). Engines whose library is not installed are skipped,
+    and pypdf is always appended as the final fallback.
     """
-    try:
-        # Create PDF reader from bytes
-        pdf_reader = PdfReader(io.BytesIO(file_content))
-        
-        # Extract text from all pages
-        text_parts = []
-        
-        for i, page in enumerate(pdf_reader.pages):
-            page_text = page.extract_text()
-            if page_text:
-                text_parts.append(page_text)
-        
-        # Combine all text
-        full_text = "\n".join(text_parts)
-        
-        # Basic de-hyphenation (remove hyphens at line breaks)
-        full_text = re.sub(r'-\s*\n\s*', '', full_text)
-        
-        # Clean up multiple whitespace
-        full_text = re.sub(r'\s+', ' ', full_text)
-        
-        # Try to extract title from metadata or first line
-        title_guess = _extract_title_guess(pdf_reader, full_text)
-        
-        return full_text, title_guess
-        
-    except Exception as e:
-        print(f"Error extracting text from PDF: {e}")
-        return "", "", None
+    names = [n.strip() for n in (engine or PDF_ENGINE).split(",") if n.strip()]
+    if DEFAULT_PDF_ENGINE not in names:
+        names.append(DEFAULT_PDF_ENGINE)
+
+    engines: List[PdfEngine] = []
+    for name in names:
+        engine_cls = PDF_ENGINES.get(name)
+        if engine_cls is None:
+            print(f"Unknown PDF engine '{name}', skipping")
+            continue
+        try:
+            engines.append(engine_cls())
+        except ImportError as e:
+            print(f"PDF engine '{name}' unavailable: {e}")
+    return engines
 
-def _extract_title_guess(pdf_reader: PdfReader, text: str) -> Optional[str]:
+
+class PdfPageStream:
+    """
+    Incremental, cleaned page text for a PDF.
+
+    Iterating yields one cleaned segment per non-empty page as soon as that page is
+    extracted; "".join(segments) equals the text extract_text_from_pdf returns.
+    De-hyphenation and whitespace collapsing are applied across page boundaries.
+    If an engine fails part-way, extraction resumes on the next engine from the
+    first page not yet yielded.
+    """
+
+    def __init__(self, file_content: bytes, engine: Optional[str] = None):
+        self.file_content = file_content
+        self.engine = engine
+        self.metadata_title: Optional[str] = None
+        self.page_count: Optional[int] = None
+        self.engine_name: Optional[str] = None
+
+    def __iter__(self) -> Iterator[str]:
+        return self._clean_segments(self._raw_pages())
+
+    def title_guess(self, text: str) -> Optional[str]:
+        """Title from metadata or the leading text extracted so far"""
+        return _extract_title_guess(self.metadata_title, text)
+
+    def _raw_pages(self) -> Iterator[str]:
+        next_page = 0
+        for pdf_engine in get_engines(self.engine):
+            try:
+                doc = pdf_engine.open(self.file_content)
+                try:
+                    self.engine_name = pdf_engine.name
+                    self.page_count = pdf_engine.page_count(doc)
+                    if self.metadata_title is None:
+                        self.metadata_title = pdf_engine.metadata_title(doc)
+                    while next_page < self.page_count:
+                        page_text = pdf_engine.page_text(doc, next_page)
+                        next_page += 1
+                        if page_text:
+                            yield page_text
+                finally:
+                    pdf_engine.close(doc)
+                return
+            except Exception as e:
+                print(f"Error extracting text from PDF with {pdf_engine.name} at page {next_page}: {e}")
+
+    @staticmethod
+    def _clean_segments(raw_pages: Iterable[str]) -> Iterator[str]:
+        glue = False  # previous page ended in a hyphen that the page break removes
+        pending_tail = ""  # that trailing hyphen, emitted only if no page follows
+        last_space = False
+        started = False
+        for raw in raw_pages:
+            if not raw:
+                continue
+            if glue:
+                # De-hyphenation across the page break also eats leading whitespace
+                pending_tail = ""
+                segment = raw.lstrip()
+                if not segment:
+                    continue
+            else:
+                segment = "\n" + raw if started else raw
+            started = True
+
+            match = _TRAILING_HYPHEN_RE.search(segment)
+            glue = match is not None
+            if match:
+                pending_tail = match.group(0)
+                segment = segment[:match.start()]
+
+            # Basic de-hyphenation (remove hyphens at line breaks)
+            segment = _HYPHEN_BREAK_RE.sub('', segment)
+            # Clean up multiple whitespace
+            segment = _WHITESPACE_RE.sub(' ', segment)
+            if last_space and segment.startswith(' '):
+                segment = segment[1:]
+            if segment:
+                last_space = segment.endswith(' ')
+                yield segment
+
+        # A hyphen at the very end survives unless a line break follows it
+        if pending_tail and "\n" not in pending_tail:
+            tail = _WHITESPACE_RE.sub(' ', pending_tail)
+            yield tail[1:] if last_space and tail.startswith(' ') else tail
+
+
+def extract_text_from_pdf(file_content: bytes, engine: Optional[str] = None) -> Tuple[str, Optional[str]]:
+    """
+    Extract text from PDF file content, falling back to the next engine on failure.
+    Returns (full_text, title_guess)
+    """
+    stream = PdfPageStream(file_content, engine)
+    full_text = "".join(stream)
+    return full_text, stream.title_guess(full_text)
+
+def _extract_title_guess(metadata_title: Optional[str], text: str) -> Optional[str]:
     """Extract a title guess from PDF metadata or first line"""
     try:
         # Try metadata first
-        if pdf_reader.metadata and pdf_reader.metadata.title:
-            title = pdf_reader.metadata.title.strip()
+        if metadata_title:
+            title = metadata_title.strip()
             if title and len(title) > 3:
                 return title
-        
+
         # Fall back to first non-empty line
         lines = text.split('\n')
         for line in lines:
@@ -54,9 +296,9 @@ def _extract_title_guess(pdf_reader: PdfReader, text: str) -> Optional[str]:
             if line and len(line) > 3 and not line.isdigit():
                 # Basic heuristic: first substantial line
                 return line[:100]  # Limit length
-        
+
         return None
-        
+
     except Exception as e:
         print(f"Error extracting title: {e}")
         return None
@@ -0,0 +1,164 @@
+import os
+import re
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+from db import get_paper_meta, update_paper_explanations
+from llm import TermExplainer
+from storage import publish_paper_meta
+from store import store
+
+# Precompute budget (configurable via environment)
+PRECOMPUTE_ENABLED = os.environ.get("GLOSSIFY_PRECOMPUTE", "1") not in ("0", "false", "False", "")
+PRECOMPUTE_TOP_N = int(os.environ.get("GLOSSIFY_PRECOMPUTE_TOP_N", "30"))
+PRECOMPUTE_BATCH_SIZE = int(os.environ.get("GLOSSIFY_PRECOMPUTE_BATCH_SIZE", "10"))
+PRECOMPUTE_WORKERS = int(os.environ.get("GLOSSIFY_PRECOMPUTE_WORKERS", "2"))
+
+# Candidate patterns
+_ACRONYM_RE = re.compile(r"\b[A-Z][A-Za-z0-9]*[A-Z][A-Za-z0-9]*s?\b")
+_CAPITALIZED_PHRASE_RE = re.compile(
+    r"\b(?!(?:The|This|These|Those|Our|We|In|On|For|An?|To|Of|By|With)\b)[A-Z][a-z]+(?:[ \-][A-Z][a-z]+)+\b"
+)
+_WORD_RE = re.compile(r"\b[a-zA-Z][a-zA-Z\-]{5,}\b")
+
+# Very common words that should never be explained on their own
+_STOPWORDS = {
+    "about", "above", "across", "after", "again", "against", "almost", "along", "already",
+    "although", "always", "among", "another", "around", "because", "become", "before",
+    "behind", "being", "below", "between", "beyond", "cannot", "could", "during", "either",
+    "enough", "especially", "every", "example", "figure", "first", "following", "further",
+    "however", "including", "indeed", "instead", "itself", "latter", "little", "mostly",
+    "neither", "others", "otherwise", "paper", "perhaps", "rather", "really", "results",
+    "second", "section", "should", "similar", "similarly", "since", "something", "still",
+    "table", "their", "themselves", "therefore", "these", "things", "third", "those",
+    "though", "through", "throughout", "together", "toward", "towards", "under", "unless",
+    "until", "using", "various", "where", "whereas", "whether", "which", "while", "within",
+    "without", "would", "approach", "method", "methods", "proposed", "present", "shown",
+    "based", "different", "number", "several", "respectively", "compared", "provide",
+    "provides", "propose", "previous", "recent", "recently", "called", "introduction",
+    "conclusion", "references", "abstract", "appendix", "related", "experiments",
+}
+
+# All-caps headings and emphasis ("THE", "AND") look like acronyms but are plain words
+_SHORT_STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "but", "by", "can", "do", "for", "from", "has",
+    "have", "if", "in", "is", "it", "its", "no", "not", "of", "on", "or", "our", "so", "than",
+    "that", "the", "then", "this", "to", "too", "was", "we", "were", "what", "when", "who",
+    "why", "will", "with", "yes", "you", "all", "any", "how", "new", "one", "two", "use",
+    "also", "each", "more", "most", "only", "such", "they", "them", "very", "here", "there",
+    "note", "data", "work", "both", "into", "over", "same", "some", "well", "been", "may",
+}
+
+_executor = ThreadPoolExecutor(max_workers=PRECOMPUTE_WORKERS, thread_name_prefix="precompute")
+
+
+def normalize_term(term: str) -> str:
+    """Normalize a selected term for explanation lookup"""
+    term = re.sub(r"\s+", " ", term or "").strip().lower()
+    return term.strip(" .,;:!?()[]{}\"'“”’")
+
+
+def mine_candidate_terms(text: str, top_n: int = PRECOMPUTE_TOP_N) -> List[str]:
+    """
+    Mine likely-to-be-selected terms from document text using local heuristics.
+    Candidates (acronyms, capitalized multi-word phrases, frequent long words) are
+    ranked by frequency with a bonus for terms that first appear early in the document.
+    """
+    if not text or top_n <= 0:
+        return []
+
+    text_length = max(len(text), 1)
+    counts: Counter = Counter()
+    first_pos: Dict[str, int] = {}
+    surface: Dict[str, str] = {}
+    weights: Dict[str, float] = {}
+
+    # Positions already claimed by an acronym or phrase, so each span is counted once
+    covered = bytearray(len(text))
+
+    def _add(match: re.Match, weight: float) -> bool:
+        term = match.group(0)
+        key = normalize_term(term)
+        if len(key) < 2 or key in _STOPWORDS or key in _SHORT_STOPWORDS:
+            return False
+        counts[key] += 1
+        weights[key] = max(weights.get(key, 0.0), weight)
+        if key not in first_pos:
+            first_pos[key] = match.start()
+            surface[key] = term
+        return True
+
+    for pattern, weight in ((_ACRONYM_RE, 2.0), (_CAPITALIZED_PHRASE_RE, 1.5)):
+        for m in pattern.finditer(text):
+            if _add(m, weight):
+                covered[m.start():m.end()] = b"\x01" * (m.end() - m.start())
+    for m in _WORD_RE.finditer(text):
+        if not (covered[m.start()] or covered[m.end() - 1]):
+            _add(m, 1.0)
+
+    scored = []
+    for key, count in counts.items():
+        # Plain words need to repeat to be worth precomputing
+        if weights[key] <= 1.0 and count < 3:
+            continue
+        position_bonus = 1.0 + (1.0 - first_pos[key] / text_length)
+        scored.append((count * weights[key] * position_bonus, key))
+
+    scored.sort(key=lambda s: (-s[0], first_pos[s[1]]))
+    return [surface[key] for _, key in scored[:top_n]]
+
+
+def precompute_explanations(
+    paper_id: str,
+    text: str,
+    glossary: Optional[Dict[str, str]] = None,
+    top_n: int = PRECOMPUTE_TOP_N,
+    batch_size: int = PRECOMPUTE_BATCH_SIZE,
+) -> Dict[str, str]:
+    """Generate explanations for the top candidate terms of a paper and persist them"""
+    known = {normalize_term(t) for t in (glossary or {})}
+    candidates = [t for t in mine_candidate_terms(text, top_n) if normalize_term(t) not in known]
+    if not candidates:
+        return {}
+
+    explainer = TermExplainer()
+    context = text[:1000]
+    explanations: Dict[str, str] = {}
+    for i in range(0, len(candidates), max(batch_size, 1)):
+        batch = candidates[i:i + batch_size]
+        try:
+            results = explainer.explain_terms(batch, context)
+        except Exception as e:
+            print(f"[Precompute] Batch failed for {paper_id}: {repr(e)}")
+            continue
+        for term, definition in results.items():
+            if definition:
+                explanations[normalize_term(term)] = definition
+
+    if explanations:
+        paper_data = store.get_paper(paper_id)
+        if paper_data:
+            paper_data.explanations = {**(paper_data.explanations or {}), **explanations}
+        try:
+            update_paper_explanations(paper_id, explanations)
+            # Other replicas load this paper from the shared mirror, not our DB
+            publish_paper_meta(paper_id, get_paper_meta(paper_id))
+        except Exception as e:
+            print(f"[Precompute] Failed to persist explanations for {paper_id}: {repr(e)}")
+    print(f"[Precompute] {paper_id}: {len(explanations)}/{len(candidates)} terms precomputed")
+    return explanations
+
+
+def schedule_precompute(paper_id: str, text: str, glossary: Optional[Dict[str, str]] = None) -> None:
+    """Run precompute in the background so it never blocks the upload response"""
+    if not PRECOMPUTE_ENABLED or PRECOMPUTE_TOP_N <= 0:
+        return
+    _executor.submit(_run_precompute, paper_id, text, glossary)
+
+
+def _run_precompute(paper_id: str, text: str, glossary: Optional[Dict[str, str]]) -> None:
+    try:
+        precompute_explanations(paper_id, text, glossary)
+    except Exception as e:
+        print(f"[Precompute] Failed for {paper_id}: {repr(e)}")
@@ -0,0 +1,152 @@
+import cProfile
+import hmac
+import json
+import os
+import random
+import re
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Iterator, Optional
+
+from flask import Flask, g, request
+
+# Opt-in per-request profiling (configurable via environment)
+PROFILE_DIR = os.environ.get('GLOSSIFY_PROFILE_DIR', '/tmp/glossify_profiles')
+PROFILE_TOKEN = os.environ.get('GLOSSIFY_PROFILE_TOKEN', '')
+PROFILE_SAMPLE_RATE = float(os.environ.get('GLOSSIFY_PROFILE_SAMPLE_RATE', '0'))
+PROFILE_HEADER = 'X-Glossify-Profile'
+SLOW_REQUEST_MS = float(os.environ.get('GLOSSIFY_SLOW_REQUEST_MS', '2000'))
+# Oldest profiles beyond this many are deleted (0 keeps everything)
+PROFILE_MAX_FILES = int(os.environ.get('GLOSSIFY_PROFILE_MAX_FILES', '200'))
+
+# cProfile can only run one profiler per process at a time
+_profiler_lock = threading.Lock()
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    """Record how long a named stage of the current request took"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings = g.get('stage_timings')
+        if timings is not None:
+            timings[name] = round(timings.get(name, 0.0) + (time.perf_counter() - start) * 1000, 2)
+
+
+def set_paper_id(paper_id: Optional[str]) -> None:
+    """Tag the current request with the paper it operates on"""
+    g.paper_id = paper_id
+
+
+def _should_profile() -> bool:
+    header = request.headers.get(PROFILE_HEADER)
+    # Compare raw bytes: compare_digest raises on non-ASCII str and the header is client-controlled.
+    # WSGI hands headers over latin-1 decoded, so this recovers the bytes the client sent.
+    if header and PROFILE_TOKEN and hmac.compare_digest(
+        header.encode('latin-1', 'replace'), PROFILE_TOKEN.encode('utf-8')
+    ):
+        g.profile_requested = True
+        return True
+    return PROFILE_SAMPLE_RATE > 0 and random.random() < PROFILE_SAMPLE_RATE
+
+
+def _start_request() -> None:
+    g.request_start = time.perf_counter()
+    g.stage_timings = {}
+    g.profiler = None
+    if _should_profile() and _profiler_lock.acquire(blocking=False):
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+            g.profiler = profiler
+        except ValueError:
+            # Another profiling tool is already active in this process
+            _profiler_lock.release()
+
+
+def _stop_profiler() -> Optional[cProfile.Profile]:
+    profiler = g.pop('profiler', None)
+    if profiler is None:
+        return None
+    try:
+        profiler.disable()
+    finally:
+        _profiler_lock.release()
+    return profiler
+
+
+def _paper_id() -> Optional[str]:
+    paper_id = g.get('paper_id') or (request.view_args or {}).get('paper_id')
+    if not paper_id and request.is_json:
+        paper_id = (request.get_json(silent=True) or {}).get('paper_id')
+    return paper_id
+
+
+def _write_profile(profiler: cProfile.Profile, duration_ms: float, paper_id: Optional[str]) -> Optional[str]:
+    """Dump the profile in pstats format (readable with pstats, snakeviz, etc.)"""
+    try:
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        endpoint = re.sub(r'[^A-Za-z0-9_.-]', '_', request.endpoint or 'unknown')
+        name = f"{datetime.utcnow().strftime('%Y%m%dT%H%M%S%f')}_{request.method}_{endpoint}_{paper_id or 'none'}_{int(duration_ms)}ms.prof"
+        path = os.path.join(PROFILE_DIR, name)
+        profiler.dump_stats(path)
+        _prune_profiles()
+        return path
+    except Exception as e:
+        print(f"[Profile] Failed to write profile: {repr(e)}")
+        return None
+
+
+def _prune_profiles() -> None:
+    """Keep only the newest PROFILE_MAX_FILES profiles so sampling cannot fill the disk"""
+    if PROFILE_MAX_FILES <= 0:
+        return
+    # Names start with a UTC timestamp, so name order is age order
+    profiles = sorted(name for name in os.listdir(PROFILE_DIR) if name.endswith('.prof'))
+    for name in profiles[:-PROFILE_MAX_FILES]:
+        try:
+            os.remove(os.path.join(PROFILE_DIR, name))
+        except FileNotFoundError:
+            pass  # pruned concurrently by another worker
+
+
+def _finish_request(response):
+    start = g.get('request_start')
+    if start is None:
+        return response
+    profiler = _stop_profiler()
+    duration_ms = (time.perf_counter() - start) * 1000
+    paper_id = _paper_id()
+
+    profile_path = _write_profile(profiler, duration_ms, paper_id) if profiler else None
+    if profile_path and g.get('profile_requested'):
+        response.headers['X-Glossify-Profile-File'] = os.path.basename(profile_path)
+
+    if duration_ms >= SLOW_REQUEST_MS:
+        print("[SlowRequest] " + json.dumps({
+            "method": request.method,
+            "path": request.path,
+            "status": response.status_code,
+            "duration_ms": round(duration_ms, 2),
+            "paper_id": paper_id,
+            "stages_ms": g.get('stage_timings') or {},
+            "profile": profile_path,
+        }))
+    return response
+
+
+def _teardown_request(exc) -> None:
+    # after_request is skipped on unhandled errors; never leave the profiler running
+    if g.get('profiler') is not None:
+        _stop_profiler()
+
+
+def init_profiling(app: Flask) -> None:
+    """Register the request hooks; call before other after_request hooks so timing covers them"""
+    app.before_request(_start_request)
+    app.after_request(_finish_request)
+    app.teardown_request(_teardown_request)
@@ -70,3 +70,20 @@ You are an expert at explaining technical terms in academic contexts.
 Provide a clear, 2-3 sentence explanation that helps someone understand 
 the term and its relevance.
 """
+
+BATCH_TERM_EXPLANATION_PROMPT = """
+You are an expert at explaining technical terms in academic contexts.
+For each term in the list, provide a clear, 2-3 sentence explanation that helps
+someone understand the term and its relevance in the context of the document.
+
+OUTPUT FORMAT
+Return only a JSON object mapping each term exactly as given to its explanation:
+{
+  "term": "explanation"
+}
+"""
+
+CONTINUE_GLOSSARY_PROMPT = """Your previous response was cut off. Continue the glossary only.
+Return a JSON object {{"glossary": {{"term": "definition"}}}} containing the remaining terms.
+Do not repeat any of these terms: {terms}.{domains_note}
+"""
@@ -0,0 +1,393 @@
+import json
+import os
+import shutil
+import tempfile
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional
+
+UPLOAD_FOLDER = os.environ.get('GLOSSIFY_UPLOADS', '/tmp/glossify_uploads')
+STORAGE_BACKEND = os.environ.get('GLOSSIFY_STORAGE', 'local')
+
+# Partially written cache files; never eviction candidates
+_CACHE_TMP_PREFIX = ".tmp-"
+
+
+def pdf_key(paper_id: str) -> str:
+    return f"papers/{paper_id}.pdf"
+
+
+def meta_key(paper_id: str) -> str:
+    return f"papers/{paper_id}.json"
+
+
+def tombstone_key(paper_id: str) -> str:
+    return f"papers/{paper_id}.deleted"
+
+
+def user_key(user_id: str) -> str:
+    return f"users/{user_id}.json"
+
+
+def user_tombstone_key(user_id: str) -> str:
+    return f"users/{user_id}.deleted"
+
+
+def user_papers_prefix(user_id: str) -> str:
+    return f"users/{user_id}/papers/"
+
+
+def paper_index_key(user_id: str, paper_id: str) -> str:
+    """Empty marker listing a paper in its owner's library"""
+    return f"{user_papers_prefix(user_id)}{paper_id}"
+
+
+class StorageBackend(ABC):
+    """Base class for PDF and metadata blob storage"""
+
+    name = "base"
+    # Shared backends are visible to every replica, so metadata is mirrored into them
+    shared = False
+
+    @abstractmethod
+    def put(self, key: str, data: bytes, content_type: str = "application/octet-stream") -> None:
+        """Store bytes under key, replacing any existing object"""
+
+    @abstractmethod
+    def get(self, key: str) -> bytes:
+        """Read the object; raises FileNotFoundError if it does not exist"""
+
+    @abstractmethod
+    def local_path(self, key: str) -> str:
+        """Path of a local file with the object's content, for streaming; raises FileNotFoundError"""
+
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        """Delete the object if it exists"""
+
+    @abstractmethod
+    def version(self, key: str) -> Optional[str]:
+        """Opaque tag that changes whenever the object is rewritten; None if it does not exist"""
+
+    @abstractmethod
+    def list_keys(self, prefix: str) -> List[str]:
+        """Names (relative to prefix) of the objects directly under prefix, not in nested folders"""
+
+    def evict_local(self, key: str) -> None:
+        """Drop any locally cached copy of the object (the stored object is untouched)"""
+
+    def presigned_url(self, key: str, expires_in: int = 3600) -> Optional[str]:
+        """Time-limited direct download URL, if the backend supports it"""
+        return None
+
+    def put_json(self, key: str, value: Any) -> None:
+        self.put(key, json.dumps(value).encode('utf-8'), content_type="application/json")
+
+    def get_json(self, key: str) -> Any:
+        return json.loads(self.get(key))
+
+
+def _legacy_path(key: str) -> Optional[str]:
+    """Rows written before the storage abstraction hold absolute local paths"""
+    if os.path.isabs(key) and os.path.exists(key):
+        return key
+    return None
+
+
+class LocalStorage(StorageBackend):
+    """Files on local disk (single node)"""
+
+    name = "local"
+
+    def __init__(self, root: str = UPLOAD_FOLDER):
+        self.root = root
+
+    def _path(self, key: str) -> str:
+        if os.path.isabs(key):
+            return key
+        path = os.path.normpath(os.path.join(self.root, key))
+        if not path.startswith(os.path.normpath(self.root) + os.sep):
+            raise ValueError(f"Invalid storage key: {key}")
+        return path
+
+    def put(self, key: str, data: bytes, content_type: str = "application/octet-stream") -> None:
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'wb') as f:
+            f.write(data)
+
+    def get(self, key: str) -> bytes:
+        with open(self.local_path(key), 'rb') as f:
+            return f.read()
+
+    def local_path(self, key: str) -> str:
+        path = self._path(key)
+        if not os.path.isfile(path):
+            raise FileNotFoundError(key)
+        return path
+
+    def delete(self, key: str) -> None:
+        path = self._path(key)
+        if os.path.exists(path):
+            os.remove(path)
+
+    def version(self, key: str) -> Optional[str]:
+        try:
+            return str(os.stat(self._path(key)).st_mtime_ns)
+        except FileNotFoundError:
+            return None
+
+    def list_keys(self, prefix: str) -> List[str]:
+        directory = os.path.join(self.root, prefix)
+        if not os.path.isdir(directory):
+            return []
+        return sorted(entry.name for entry in os.scandir(directory) if entry.is_file())
+
+
+class S3Storage(StorageBackend):
+    """
+    S3-compatible object storage shared by all replicas (AWS S3, MinIO, or any local
+    stand-in reachable through endpoint_url). Reads go through a small on-disk LRU
+    cache so repeated opens of the same PDF on a replica stay local.
+    """
+
+    name = "s3"
+    shared = True
+
+    def __init__(
+        self,
+        bucket: str,
+        prefix: str = "",
+        endpoint_url: Optional[str] = None,
+        region: Optional[str] = None,
+        cache_dir: Optional[str] = None,
+        cache_max_bytes: int = 512 * 1024 * 1024,
+        presign: bool = False,
+    ):
+        import boto3
+        from botocore.exceptions import ClientError
+        self._client_error = ClientError
+        self.client = boto3.client("s3", endpoint_url=endpoint_url, region_name=region)
+        self.bucket = bucket
+        self.prefix = prefix.strip("/")
+        self.cache_dir = cache_dir or os.path.join(tempfile.gettempdir(), "glossify_storage_cache")
+        self.cache_max_bytes = cache_max_bytes
+        self.presign = presign
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def _object_key(self, key: str) -> str:
+        return f"{self.prefix}/{key}" if self.prefix else key
+
+    def _cache_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key.replace("/", "__"))
+
+    def _is_missing(self, e: Exception) -> bool:
+        code = str(getattr(e, "response", {}).get("Error", {}).get("Code", ""))
+        return code in ("404", "NoSuchKey", "NotFound")
+
+    def put(self, key: str, data: bytes, content_type: str = "application/octet-stream") -> None:
+        self.client.put_object(Bucket=self.bucket, Key=self._object_key(key), Body=data, ContentType=content_type)
+        # Write-through so the uploading replica serves the first read locally
+        if content_type == "application/pdf":
+            self._cache_store(key, data)
+
+    def get(self, key: str) -> bytes:
+        # Uncached, so metadata read here is always current
+        legacy = _legacy_path(key)
+        if legacy:
+            with open(legacy, 'rb') as f:
+                return f.read()
+        try:
+            response = self.client.get_object(Bucket=self.bucket, Key=self._object_key(key))
+        except self._client_error as e:
+            if self._is_missing(e):
+                raise FileNotFoundError(key) from e
+            raise
+        return response["Body"].read()
+
+    def local_path(self, key: str) -> str:
+        legacy = _legacy_path(key)
+        if legacy:
+            return legacy
+        path = self._cache_path(key)
+        if os.path.exists(path):
+            os.utime(path)  # mark as recently used
+            return path
+        try:
+            response = self.client.get_object(Bucket=self.bucket, Key=self._object_key(key))
+        except self._client_error as e:
+            if self._is_missing(e):
+                raise FileNotFoundError(key) from e
+            raise
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, prefix=_CACHE_TMP_PREFIX)
+        with os.fdopen(fd, 'wb') as f:
+            shutil.copyfileobj(response["Body"], f)
+            size = f.tell()
+        # Make room before the new entry lands, so eviction can never remove the file we return
+        self._evict(reserve=size)
+        os.replace(tmp_path, path)
+        return path
+
+    def delete(self, key: str) -> None:
+        if _legacy_path(key):
+            os.remove(key)
+            return
+        self.client.delete_object(Bucket=self.bucket, Key=self._object_key(key))
+        self.evict_local(key)
+
+    def version(self, key: str) -> Optional[str]:
+        try:
+            response = self.client.head_object(Bucket=self.bucket, Key=self._object_key(key))
+        except self._client_error as e:
+            if self._is_missing(e):
+                return None
+            raise
+        return response.get("ETag")
+
+    def list_keys(self, prefix: str) -> List[str]:
+        object_prefix = self._object_key(prefix)
+        names = []
+        paginator = self.client.get_paginator("list_objects_v2")
+        for page in paginator.paginate(Bucket=self.bucket, Prefix=object_prefix, Delimiter="/"):
+            names.extend(item["Key"][len(object_prefix):] for item in page.get("Contents", []))
+        return names
+
+    def evict_local(self, key: str) -> None:
+        try:
+            os.remove(self._cache_path(key))
+        except FileNotFoundError:
+            pass
+
+    def presigned_url(self, key: str, expires_in: int = 3600) -> Optional[str]:
+        if not self.presign or _legacy_path(key):
+            return None
+        return self.client.generate_presigned_url(
+            "get_object",
+            Params={"Bucket": self.bucket, "Key": self._object_key(key)},
+            ExpiresIn=expires_in,
+        )
+
+    def _cache_store(self, key: str, data: bytes) -> None:
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, prefix=_CACHE_TMP_PREFIX)
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            self._evict(reserve=len(data))
+            os.replace(tmp_path, self._cache_path(key))
+        except Exception as e:
+            print(f"Storage cache write failed for {key}: {repr(e)}")
+
+    def _evict(self, reserve: int = 0) -> None:
+        """Drop least recently used cache entries until reserve more bytes fit under cache_max_bytes"""
+        entries = []
+        total = reserve
+        for entry in os.scandir(self.cache_dir):
+            if entry.is_file() and not entry.name.startswith(_CACHE_TMP_PREFIX):
+                st = entry.stat()
+                entries.append((st.st_mtime, st.st_size, entry.path))
+                total += st.st_size
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.cache_max_bytes:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except FileNotFoundError:
+                pass
+
+
+_storage: Optional[StorageBackend] = None
+
+
+def get_storage() -> StorageBackend:
+    """Storage backend selected by GLOSSIFY_STORAGE (local or s3)"""
+    global _storage
+    if _storage is None:
+        if STORAGE_BACKEND == "s3":
+            _storage = S3Storage(
+                bucket=os.environ["GLOSSIFY_S3_BUCKET"],
+                prefix=os.environ.get("GLOSSIFY_S3_PREFIX", ""),
+                endpoint_url=os.environ.get("GLOSSIFY_S3_ENDPOINT_URL") or None,
+                region=os.environ.get("GLOSSIFY_S3_REGION") or None,
+                cache_dir=os.environ.get("GLOSSIFY_STORAGE_CACHE_DIR") or None,
+                cache_max_bytes=int(os.environ.get("GLOSSIFY_STORAGE_CACHE_MB", "512")) * 1024 * 1024,
+                presign=os.environ.get("GLOSSIFY_S3_PRESIGN", "0") in ("1", "true", "True"),
+            )
+        else:
+            _storage = LocalStorage(UPLOAD_FOLDER)
+    return _storage
+
+
+def publish_paper_meta(paper_id: str, meta: Optional[Dict[str, Any]]) -> None:
+    """Mirror a paper's DB row into shared storage so other replicas can load and list it"""
+    storage = get_storage()
+    if storage.shared and meta:
+        storage.put_json(meta_key(paper_id), meta)
+        if meta.get("user_id"):
+            storage.put(paper_index_key(meta["user_id"], paper_id), b"", content_type="application/octet-stream")
+
+
+def publish_paper_deleted(paper_id: str, user_id: Optional[str] = None) -> None:
+    """Leave a tombstone so other replicas drop their local copies of a deleted paper"""
+    storage = get_storage()
+    if storage.shared:
+        storage.put(tombstone_key(paper_id), b"", content_type="application/octet-stream")
+        if user_id:
+            storage.delete(paper_index_key(user_id, paper_id))
+
+
+def list_shared_papers(user_id: str) -> List[str]:
+    """IDs of the papers in a user's library according to shared storage"""
+    return get_storage().list_keys(user_papers_prefix(user_id))
+
+
+def publish_user(user: Optional[Dict[str, Any]]) -> None:
+    """Mirror a user (profile) row into shared storage"""
+    storage = get_storage()
+    if storage.shared and user:
+        storage.put_json(user_key(user["id"]), user)
+
+
+def publish_user_deleted(user_id: str) -> None:
+    storage = get_storage()
+    if storage.shared:
+        storage.put(user_tombstone_key(user_id), b"", content_type="application/octet-stream")
+        storage.delete(user_key(user_id))
+
+
+def list_shared_users() -> Dict[str, List[str]]:
+    """{"live": [...], "deleted": [...]} user IDs according to shared storage"""
+    live, deleted = [], []
+    for name in get_storage().list_keys("users/"):
+        if name.endswith(".json"):
+            live.append(name[:-len(".json")])
+        elif name.endswith(".deleted"):
+            deleted.append(name[:-len(".deleted")])
+    return {"live": live, "deleted": deleted}
+
+
+def fetch_user(user_id: str) -> Optional[Dict[str, Any]]:
+    storage = get_storage()
+    if not storage.shared:
+        return None
+    try:
+        return storage.get_json(user_key(user_id))
+    except FileNotFoundError:
+        return None
+
+
+def paper_deleted(paper_id: str) -> bool:
+    """Whether another replica deleted this paper from shared storage"""
+    storage = get_storage()
+    return storage.shared and storage.version(tombstone_key(paper_id)) is not None
+
+
+def fetch_paper_meta(paper_id: str) -> Optional[Dict[str, Any]]:
+    """Load a paper's DB row mirrored by another replica, if any"""
+    storage = get_storage()
+    if not storage.shared:
+        return None
+    try:
+        return storage.get_json(meta_key(paper_id))
+    except FileNotFoundError:
+        return None
@@ -0,0 +1,146 @@
+"""Compare PDF extraction engines over a synthetic corpus.
+
+For every engine and document this reports pages per second, peak Python heap
+(tracemalloc), peak process RSS and how closely the extracted text matches the
+pypdf baseline. Each engine runs in its own process so RSS numbers are not
+polluted by the other engines.
+
+Usage (from backend/):
+    python bench/bench_extraction.py --pages 1 10 50 --fonts helvetica times --columns 1 2
+    python bench/bench_extraction.py --engines pypdf pypdfium2 --json bench_extraction.json
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import re
+import resource
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections import Counter
+from typing import Dict, List
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "app"))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from pdf_corpus import build_corpus  # noqa: E402
+from pdf_io import PDF_ENGINES, PdfPageStream  # noqa: E402
+
+
+def _token_overlap(a: str, b: str) -> float:
+    """Multiset overlap of whitespace tokens (1.0 means same words, same counts)"""
+    ca, cb = Counter(re.findall(r"\S+", a)), Counter(re.findall(r"\S+", b))
+    total = max(sum(ca.values()), sum(cb.values()))
+    if total == 0:
+        return 1.0
+    return sum((ca & cb).values()) / total
+
+
+def extract_with_engine(content: bytes, engine: str) -> str:
+    """
+    Extract text with exactly this engine. pdf_io silently falls back to pypdf, which
+    would otherwise get measured under the requested engine's name.
+    """
+    stream = PdfPageStream(content, engine)
+    text = "".join(stream)
+    stream.title_guess(text)
+    if stream.engine_name != engine:
+        raise RuntimeError(f"{engine} unavailable or failed; extraction fell back to {stream.engine_name}")
+    return text
+
+
+def _run_engine(engine: str, manifest: List[Dict], repeat: int) -> Dict:
+    """Benchmark one engine over the corpus (runs in a child process)"""
+    results = []
+    texts = {}
+    for doc in manifest:
+        with open(doc["path"], "rb") as f:
+            content = f.read()
+
+        # Warm up imports and caches outside the measurement
+        extract_with_engine(content, engine)
+
+        timings = []
+        tracemalloc.start()
+        for _ in range(repeat):
+            start = time.perf_counter()
+            text = extract_with_engine(content, engine)
+            timings.append(time.perf_counter() - start)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        best = min(timings)
+        texts[doc["name"]] = text
+        results.append({
+            "doc": doc["name"],
+            "pages": doc["pages"],
+            "font": doc["font"],
+            "columns": doc["columns"],
+            "seconds": best,
+            "pages_per_sec": doc["pages"] / best if best else None,
+            "peak_heap_kb": peak / 1024,
+        })
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == "darwin":
+        rss //= 1024
+    return {"engine": engine, "results": results, "texts": texts, "peak_rss_kb": rss}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark PDF extraction engines")
+    parser.add_argument("--engines", nargs="+", default=list(PDF_ENGINES))
+    parser.add_argument("--pages", nargs="+", type=int, default=[1, 10, 50, 200])
+    parser.add_argument("--fonts", nargs="+", default=["helvetica", "times", "courier"])
+    parser.add_argument("--columns", nargs="+", type=int, default=[1, 2])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--corpus-dir", default=os.path.join(tempfile.gettempdir(), "glossify_bench_corpus"))
+    parser.add_argument("--json", help="Write full results to this JSON file")
+    args = parser.parse_args()
+
+    manifest = build_corpus(args.corpus_dir, args.pages, args.fonts, args.columns)
+    print(f"Corpus: {len(manifest)} PDFs in {args.corpus_dir}")
+
+    engines = [e for e in args.engines if e in PDF_ENGINES]
+    if "pypdf" not in engines:
+        engines.insert(0, "pypdf")
+
+    runs = {}
+    ctx = multiprocessing.get_context("spawn")
+    for engine in engines:
+        with ctx.Pool(1) as pool:
+            try:
+                runs[engine] = pool.apply(_run_engine, (engine, manifest, args.repeat))
+            except Exception as e:
+                print(f"{engine}: failed, not reported ({e})")
+
+    baseline = runs.get("pypdf", {}).get("texts", {})
+    report = []
+    print(f"\n{'engine':<10} {'doc':<36} {'pages/s':>10} {'heap KB':>10} {'overlap':>8} {'equal':>6}")
+    for engine, run in runs.items():
+        for row in run["results"]:
+            text = run["texts"][row["doc"]]
+            row["engine"] = engine
+            row["token_overlap"] = _token_overlap(baseline.get(row["doc"], ""), text)
+            row["text_equal"] = text == baseline.get(row["doc"])
+            report.append(row)
+            print(
+                f"{engine:<10} {row['doc']:<36} {row['pages_per_sec']:>10.1f} "
+                f"{row['peak_heap_kb']:>10.0f} {row['token_overlap']:>8.3f} {str(row['text_equal']):>6}"
+            )
+        print(f"{engine:<10} peak RSS: {run['peak_rss_kb'] / 1024:.1f} MB")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({
+                "engines": {e: {"peak_rss_kb": r["peak_rss_kb"]} for e, r in runs.items()},
+                "results": report,
+            }, f, indent=2)
+        print(f"\nWrote {args.json}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,93 @@
+"""Compare two bench_hotpaths.py result files and flag regressions.
+
+Exits non-zero when any benchmark's median latency or peak memory grew by more
+than --threshold (relative) over the baseline. Tiny absolute changes are
+ignored so sub-microsecond noise does not fail a run. Both files must come from
+runs with the same scales, otherwise most benchmarks would not be compared.
+
+Usage (from backend/):
+    python bench/compare.py baseline.json current.json --threshold 0.15
+"""
+import argparse
+import json
+import sys
+from typing import Dict, List, Tuple
+
+# Run settings that must match for the comparison to cover the same benchmarks
+SCALE_KEYS = ("paper_scales", "page_scales")
+
+# metric -> smallest absolute increase that can count as a regression
+METRICS: Dict[str, float] = {
+    "median_ms": 0.005,
+    "peak_kb": 16.0,
+}
+
+
+def scale_mismatches(baseline: Dict, current: Dict) -> List[str]:
+    base_meta, cur_meta = baseline.get("meta", {}), current.get("meta", {})
+    return [
+        f"{key}: {base_meta.get(key)} vs {cur_meta.get(key)}"
+        for key in SCALE_KEYS
+        if base_meta.get(key) != cur_meta.get(key)
+    ]
+
+
+def compare(baseline: Dict, current: Dict, threshold: float) -> Tuple[List[str], List[str]]:
+    lines, regressions = [], []
+    base_results = baseline.get("results", {})
+    for key, result in sorted(current.get("results", {}).items()):
+        base = base_results.get(key)
+        if base is None:
+            lines.append(f"{'new':<11} {key}")
+            continue
+        for metric, min_delta in METRICS.items():
+            old, new = base.get(metric), result.get(metric)
+            if old is None or new is None:
+                continue
+            change = (new - old) / old if old else 0.0
+            status = "ok"
+            if change > threshold and new - old > min_delta:
+                status = "REGRESSION"
+                regressions.append(f"{key} {metric}: {old:.4g} -> {new:.4g} ({change:+.1%})")
+            elif change < -threshold and old - new > min_delta:
+                status = "improved"
+            lines.append(f"{status:<11} {key} {metric}: {old:.4g} -> {new:.4g} ({change:+.1%})")
+    for key in sorted(set(base_results) - set(current.get("results", {}))):
+        lines.append(f"{'missing':<11} {key}")
+    return lines, regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Compare benchmark results")
+    parser.add_argument("baseline")
+    parser.add_argument("current")
+    parser.add_argument("--threshold", type=float, default=0.15, help="Allowed relative increase (0.15 = 15%%)")
+    args = parser.parse_args()
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.current) as f:
+        current = json.load(f)
+
+    print(f"baseline {baseline.get('meta', {}).get('commit')} vs current {current.get('meta', {}).get('commit')}")
+    mismatches = scale_mismatches(baseline, current)
+    if mismatches:
+        print("Runs used different scales; re-run both with the same --quick/--papers/--pages flags:")
+        for m in mismatches:
+            print(f"  {m}")
+        return 2
+    lines, regressions = compare(baseline, current, args.threshold)
+    for line in lines:
+        print(line)
+
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) over {args.threshold:.0%}:")
+        for r in regressions:
+            print(f"  {r}")
+        return 1
+    print("\nNo regressions")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
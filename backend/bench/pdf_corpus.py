@@ -0,0 +1,142 @@
+"""Synthetic PDF and text corpus for benchmarks.
+
+Writes minimal, valid PDFs by hand (no extra dependencies) using the standard
+Type1 fonts, with configurable page count, font and column layout. Text is
+drawn from a fixed vocabulary with a seeded RNG so runs are reproducible, and
+includes hyphenated line breaks to exercise de-hyphenation.
+"""
+import os
+import random
+from typing import Dict, List, Optional
+
+FONTS = {
+    "helvetica": "Helvetica",
+    "times": "Times-Roman",
+    "courier": "Courier",
+}
+
+_VOCAB = (
+    "contrastive learning retrieval transformer attention embedding latent gradient "
+    "optimization benchmark dataset evaluation baseline ablation encoder decoder "
+    "tokenization inference sampling regularization convolution representation "
+    "alignment supervision distillation quantization throughput latency variance "
+    "the of and to in for with on by is are we our this that from as an model method"
+).split()
+_ACRONYMS = ["LLM", "CNN", "RNN", "T2V", "V2T", "CiCo", "BERT", "GPT", "SGD", "MLP"]
+
+PAGE_WIDTH = 612
+PAGE_HEIGHT = 792
+MARGIN = 54
+FONT_SIZE = 10
+LEADING = 12
+
+
+def _escape(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def make_text(words: int, seed: int = 0) -> str:
+    """Plain synthetic text drawn from the same vocabulary as the PDFs"""
+    rng = random.Random(seed)
+    return " ".join(rng.choice(_ACRONYMS) if rng.random() < 0.05 else rng.choice(_VOCAB) for _ in range(words))
+
+
+def _lines_for_column(rng: random.Random, chars_per_line: int, line_count: int) -> List[str]:
+    lines = []
+    for _ in range(line_count):
+        words: List[str] = []
+        length = 0
+        while length < chars_per_line:
+            word = rng.choice(_ACRONYMS) if rng.random() < 0.05 else rng.choice(_VOCAB)
+            words.append(word)
+            length += len(word) + 1
+        line = " ".join(words)
+        if len(line) > chars_per_line:
+            # Break the last word with a hyphen, as typeset papers do
+            line = line[:chars_per_line] + "-"
+        lines.append(line)
+    return lines
+
+
+def _page_stream(rng: random.Random, columns: int) -> bytes:
+    usable_width = PAGE_WIDTH - 2 * MARGIN
+    gutter = 18
+    column_width = (usable_width - gutter * (columns - 1)) / columns
+    # Rough average glyph width of 0.5em for the standard fonts
+    chars_per_line = max(int(column_width / (FONT_SIZE * 0.5)), 10)
+    line_count = int((PAGE_HEIGHT - 2 * MARGIN) / LEADING)
+
+    ops = []
+    for col in range(columns):
+        x = MARGIN + col * (column_width + gutter)
+        y = PAGE_HEIGHT - MARGIN
+        ops.append(f"BT /F1 {FONT_SIZE} Tf {LEADING} TL {x:.1f} {y} Td")
+        for line in _lines_for_column(rng, chars_per_line, line_count):
+            ops.append(f"({_escape(line)}) Tj T*")
+        ops.append("ET")
+    return "\n".join(ops).encode("latin-1")
+
+
+def make_pdf(pages: int, font: str = "helvetica", columns: int = 1, seed: int = 0, title: Optional[str] = None) -> bytes:
+    """Build a synthetic PDF and return its bytes"""
+    rng = random.Random(seed)
+    base_font = FONTS[font]
+
+    # Object numbering: 1 catalog, 2 pages, 3 font, 4 info, then (page, content) pairs
+    objects: Dict[int, bytes] = {}
+    page_ids = []
+    next_id = 5
+    for _ in range(pages):
+        page_id, content_id = next_id, next_id + 1
+        next_id += 2
+        stream = _page_stream(rng, columns)
+        objects[content_id] = b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream"
+        objects[page_id] = (
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {PAGE_WIDTH} {PAGE_HEIGHT}] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {content_id} 0 R >>"
+        ).encode("latin-1")
+        page_ids.append(page_id)
+
+    kids = " ".join(f"{pid} 0 R" for pid in page_ids)
+    objects[1] = b"<< /Type /Catalog /Pages 2 0 R >>"
+    objects[2] = f"<< /Type /Pages /Kids [{kids}] /Count {pages} >>".encode("latin-1")
+    objects[3] = f"<< /Type /Font /Subtype /Type1 /BaseFont /{base_font} /Encoding /WinAnsiEncoding >>".encode("latin-1")
+    doc_title = title or f"Synthetic Paper ({pages} pages, {font}, {columns} col)"
+    objects[4] = f"<< /Title ({_escape(doc_title)}) /Producer (glossify-bench) >>".encode("latin-1")
+
+    out = bytearray(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+    offsets = {}
+    for obj_id in sorted(objects):
+        offsets[obj_id] = len(out)
+        out += b"%d 0 obj\n" % obj_id + objects[obj_id] + b"\nendobj\n"
+
+    xref_offset = len(out)
+    size = max(objects) + 1
+    out += b"xref\n0 %d\n" % size
+    out += b"0000000000 65535 f \n"
+    for obj_id in range(1, size):
+        out += b"%010d 00000 n \n" % offsets[obj_id]
+    out += b"trailer\n<< /Size %d /Root 1 0 R /Info 4 0 R >>\n" % size
+    out += b"startxref\n%d\n%%%%EOF\n" % xref_offset
+    return bytes(out)
+
+
+def build_corpus(
+    out_dir: str,
+    page_counts: List[int],
+    fonts: Optional[List[str]] = None,
+    columns: Optional[List[int]] = None,
+) -> List[Dict]:
+    """Write one PDF per (pages, font, columns) combination; returns a manifest"""
+    os.makedirs(out_dir, exist_ok=True)
+    manifest = []
+    for pages in page_counts:
+        for font in fonts or ["helvetica"]:
+            for cols in columns or [1]:
+                name = f"synthetic_{pages}p_{font}_{cols}col.pdf"
+                path = os.path.join(out_dir, name)
+                if not os.path.exists(path):
+                    with open(path, "wb") as f:
+                        f.write(make_pdf(pages, font=font, columns=cols, seed=pages * 31 + cols))
+                manifest.append({"name": name, "path": path, "pages": pages, "font": font, "columns": cols})
+    return manifest